@@ -0,0 +1,103 @@
+# src/api.py
+"""
+CSV를 거치지 않고 파이썬 안에서 바로 쓰는 라이브러리 API.
+
+사용 예:
+    from api import prepare, render
+    from collect_korea_market_cap_monthly import collect_monthly
+
+    df = collect_monthly("2015-01-01")
+    prepared = prepare(
+        df, time_col="date", entity_col="name", value_col="market_cap",
+        time_unit="month",
+    )
+    render(prepared, output="outputs/kospi.mp4", top_n=10, title="KOSPI 시가총액")
+
+CLI(main.py)와 예전 스크립트(rank_race_video.py)도 모두 이 API를 거쳐서 실행됨.
+"""
+
+from dataclasses import dataclass, field, fields
+from typing import List, Optional
+
+import pandas as pd
+
+from data_processing import load_and_prepare_data, prepare_dataframe
+
+
+@dataclass
+class PreparedData:
+    """prepare() 결과: index=시간, columns=entity인 pivot + 기간 라벨 포맷."""
+    pivot: pd.DataFrame
+    period_fmt: Optional[str] = None
+
+
+@dataclass
+class RenderOptions:
+    """render()에 넘기는 옵션. 이름/기본값은 cli.py의 인자와 같음."""
+    output: str = "rank_race.mp4"
+    top_n: int = 15
+    title: str = "Rank Race"
+    steps_per_period: int = 8
+    period_length: int = 500
+    style: str = "pastel_wood"
+    engine: str = "matplotlib"
+    interpolation: str = "fixed"
+    frame_budget: Optional[int] = None
+    duration_budget: Optional[float] = None
+    end_pause: int = 0
+    frame_holds: str = "vfr"
+    extra_output: List[str] = field(default_factory=list)
+
+
+def prepare(df, time_col: str = "time", entity_col: str = "entity",
+            value_col: str = "value", time_format: Optional[str] = None,
+            time_unit: str = "raw", start_time=None, end_time=None,
+            dtype: str = "float64", value_scale: float = 1_000_000,
+            agg: str = "last") -> PreparedData:
+    """
+    long 형태 DataFrame / pyarrow Table → PreparedData (시간 파싱, 기간 필터, 단위 변환, 피벗).
+    값은 value_scale로 나눈 화면 단위로, dtype 정책(float64/float32/int64)에 맞춰 저장됨.
+    같은 (time, entity) 중복 행은 agg(last/sum/max/mean)로 합침.
+    """
+    pivot, period_fmt = prepare_dataframe(
+        df,
+        time_col=time_col,
+        entity_col=entity_col,
+        value_col=value_col,
+        time_format=time_format,
+        time_unit=time_unit,
+        start_time=start_time,
+        end_time=end_time,
+        dtype=dtype,
+        value_scale=value_scale,
+        agg=agg,
+    )
+    return PreparedData(pivot, period_fmt)
+
+
+def render(prepared: PreparedData, output: str = "rank_race.mp4", **options) -> str:
+    """PreparedData를 영상으로 렌더링하고 메인 출력 경로를 반환. options는 RenderOptions 필드."""
+    # chart는 무거운 의존성(bar_chart_race, matplotlib 애니메이션)을 가져오므로 여기서 import
+    from chart import render_rank_race_video
+
+    opts = RenderOptions(output=output, **options)
+    render_rank_race_video(prepared.pivot, prepared.period_fmt, opts)
+    return opts.output
+
+
+def render_options_from_args(args) -> dict:
+    """argparse 결과에서 RenderOptions에 해당하는 값만 뽑음 (output 제외)."""
+    return {
+        f.name: getattr(args, f.name)
+        for f in fields(RenderOptions)
+        if f.name != "output" and getattr(args, f.name, None) is not None
+    }
+
+
+def run_from_args(args) -> str:
+    """CLI 진입점에서 쓰는 헬퍼: 입력 로드 → prepare → render."""
+    pivot, period_fmt = load_and_prepare_data(args)
+    return render(
+        PreparedData(pivot, period_fmt), output=args.output,
+        **render_options_from_args(args),
+    )
@@ -1,21 +1,159 @@
 # src/chart.py
 
+import inspect
+
 import matplotlib
 import matplotlib.pyplot as plt
+import numpy as np
 import bar_chart_race as bcr
-
+from bar_chart_race._make_chart import _BarChartRace
+from matplotlib.animation import FuncAnimation
+
+from data_processing import report_bytes
+from export import MultiOutputWriter, OutputTarget, parse_output_spec
+from frame_plan import (
+    find_frame_holds,
+    format_period_labels,
+    plan_adaptive_steps,
+    prepare_frames,
+)
+from raster_engine import RasterRenderer, render_raster_video
 from styles import apply_style
 from utils.top_n_filter import filter_top_n_per_time
 
 
+class _RankRaceAnimation(_BarChartRace):
+    """
+    bar_chart_race 내부 클래스를 살짝 확장.
+    원본 make_animation은 writer 인스턴스에 fps를 같이 넘겨서
+    최신 matplotlib에서 에러가 나므로, 저장 부분만 직접 처리.
+    frame_steps를 주면 기간 쌍마다 다른 보간 step 수를 사용 (adaptive 모드).
+    frame_indices를 주면 그 프레임만 그림 (정지 구간은 writer가 길이만 늘림).
+    """
+
+    def __init__(self, *args, frame_steps=None, **kwargs):
+        # 부모 __init__ 안에서 prepare_data가 호출되므로 먼저 세팅
+        self.frame_steps = frame_steps
+        self.frame_indices = None
+        super().__init__(*args, **kwargs)
+
+    def prepare_data(self, df):
+        if self.frame_steps is None:
+            return super().prepare_data(df)
+        return prepare_frames(
+            df, self.frame_steps, self.orientation, self.sort,
+            self.n_bars, self.interpolate_period,
+        )
+
+    def make_animation(self):
+        def init_func():
+            self.plot_bars(0)
+
+        frames = self.frame_indices
+        if frames is None:
+            frames = range(len(self.df_values))
+
+        interval = self.period_length / self.steps_per_period
+        anim = FuncAnimation(
+            self.fig, self.anim_func, list(frames),
+            init_func, interval=interval,
+        )
+        try:
+            anim.save(self.filename, writer=self.writer)
+        finally:
+            plt.rcParams = self.orig_rcParams
+
+
+def _make_race(frame_steps=None, **kwargs):
+    """bcr.bar_chart_race()와 같은 인자를 받아서 _RankRaceAnimation 생성 (생략 인자는 bcr 기본값)."""
+    bound = inspect.signature(bcr.bar_chart_race).bind(**kwargs)
+    bound.apply_defaults()
+    return _RankRaceAnimation(frame_steps=frame_steps, **bound.arguments)
+
+
+def _plan_frame_steps(pivot, args, fps):
+    """--interpolation adaptive일 때 구간별 step 수 계산 (fixed면 None → bcr 기본 동작)."""
+    if getattr(args, "interpolation", "fixed") != "adaptive":
+        return None
+
+    budget = getattr(args, "frame_budget", None)
+    duration = getattr(args, "duration_budget", None)
+    if budget is None and duration is not None:
+        budget = int(round(duration * fps))
+
+    steps = plan_adaptive_steps(
+        pivot, args.top_n, args.steps_per_period, budget=budget,
+        min_active_steps=getattr(args, "min_active_steps", None),
+    )
+    fixed_total = (len(pivot) - 1) * args.steps_per_period
+    print(f"적응형 보간: 프레임 {int(steps.sum()) + 1:,}개 (고정 방식 {fixed_total + 1:,}개)")
+    return steps
+
+
 def render_rank_race_video(pivot, period_fmt, args):
-    pivot = pivot.sort_index()
+    if not pivot.index.is_monotonic_increasing:
+        pivot = pivot.sort_index()
     pivot = filter_top_n_per_time(pivot, args.top_n)
+    report_bytes(f"Top {args.top_n} 필터 ({pivot.shape[0]}x{pivot.shape[1]})", pivot.to_numpy().nbytes)
 
-    # 🔥 영상에서는 값만 '백만' 단위로 축소해서 사용 (원본 CSV는 그대로 유지)
-    pivot = pivot / 1_000_000  
+    # 🔥 '백만' 단위 축소(value_scale)는 데이터 준비 단계에서 이미 한 번 적용됨
 
     style_cfg = apply_style(getattr(args, "style", "pastel_wood"))
+
+    # 🔥 프레임은 한 번만 그리고, 추가 출력(720p/정사각형/GIF 등)은 인코더 스레드로 동시에 저장
+    extra_targets = [parse_output_spec(spec) for spec in (getattr(args, "extra_output", None) or [])]
+    fps = 1000 / args.period_length * args.steps_per_period
+    frame_steps = _plan_frame_steps(pivot, args, fps)
+
+    if getattr(args, "engine", "matplotlib") == "raster":
+        _render_raster(pivot, period_fmt, args, style_cfg, frame_steps, fps, extra_targets)
+    else:
+        _render_matplotlib(pivot, period_fmt, args, style_cfg, frame_steps, fps, extra_targets)
+
+    print("생성 완료:", args.output)
+    for target in extra_targets:
+        print("생성 완료:", target.path)
+
+
+def _hold_options(args):
+    """정지 구간 처리 옵션: (vfr 여부, 마지막 장면 정지 시간(초))."""
+    vfr = getattr(args, "frame_holds", "vfr") == "vfr"
+    end_pause = (getattr(args, "end_pause", 0) or 0) / 1000
+    return vfr, end_pause
+
+
+def _report_holds(repeats):
+    n_total = int(np.sum(repeats))
+    if n_total > len(repeats):
+        print(f"정지 구간: {n_total:,}프레임 중 {len(repeats):,}프레임만 렌더링")
+
+
+def _render_raster(pivot, period_fmt, args, style_cfg, frame_steps, fps, extra_targets):
+    """--engine raster: 보간은 frame_plan으로 직접 하고, 합성은 raster_engine에 맡김."""
+    if frame_steps is None:
+        frame_steps = np.full(max(len(pivot) - 1, 0), args.steps_per_period)
+
+    df_values, df_ranks = prepare_frames(
+        pivot, frame_steps, n_bars=args.top_n, interpolate_period=True
+    )
+    report_bytes(f"프레임 values/ranks ({len(df_values):,} frames)",
+                 df_values.to_numpy().nbytes + df_ranks.to_numpy().nbytes)
+    period_labels = format_period_labels(df_values.index, period_fmt)
+    renderer = RasterRenderer(
+        df_values, df_ranks, period_labels, args.title, args.top_n, style_cfg,
+    )
+
+    frame_indices, repeats = find_frame_holds(df_values, df_ranks, period_labels)
+    _report_holds(repeats)
+
+    vfr, end_pause = _hold_options(args)
+    targets = [OutputTarget(args.output)] + extra_targets
+    render_raster_video(
+        renderer, targets, fps, frame_indices, repeats, vfr=vfr, end_pause=end_pause,
+    )
+
+
+def _render_matplotlib(pivot, period_fmt, args, style_cfg, frame_steps, fps, extra_targets):
     fig, ax = plt.subplots(figsize=(16, 9), dpi=160)
 
     # ── 레이아웃 (여백) ──
@@ -47,8 +185,11 @@ def render_rank_race_video(pivot, period_fmt, args):
     )
 
     shared_fontdict = {"family": matplotlib.rcParams["font.family"]}
+    vfr, end_pause = _hold_options(args)
+    writer = MultiOutputWriter(fps, extra_targets, vfr=vfr, end_pause=end_pause)
 
-    bcr.bar_chart_race(
+    race = _make_race(
+        frame_steps=frame_steps,
         df=pivot,
         filename=args.output,
         n_bars=args.top_n,
@@ -83,6 +224,19 @@ def render_rank_race_video(pivot, period_fmt, args):
         bar_size=style_cfg.get("bar_size", 0.78),
         bar_kwargs={"alpha": 0.94},
         cmap=style_cfg.get("cmap", "Pastel1"),
+        writer=writer,
     )
 
-    print("생성 완료:", args.output)
+    report_bytes(f"프레임 values/ranks ({len(race.df_values):,} frames)",
+                 race.df_values.to_numpy().nbytes + race.df_ranks.to_numpy().nbytes)
+
+    # 직전 프레임과 데이터가 같은 프레임은 다시 그리지 않고 표시 시간만 늘림
+    frame_indices, repeats = find_frame_holds(
+        race.df_values, race.df_ranks,
+        format_period_labels(race.df_values.index, period_fmt),
+    )
+    _report_holds(repeats)
+    race.frame_indices = frame_indices
+    writer.frame_repeats = repeats
+
+    race.make_animation()
@@ -3,18 +3,56 @@
 import argparse
 
 
-def parse_args():
+def parse_args(argv=None, **defaults):
+    """
+    CLI 인자 파싱. defaults로 일부 인자의 기본값을 덮어쓸 수 있음
+    (예: rank_race_video.py는 style="deep_navy").
+    """
     parser = argparse.ArgumentParser(
         description="시계열 순위 변화 Bar Chart Race 영상 생성기 (일/월 단위 선택 가능)"
     )
 
     # 기본 입출력
-    parser.add_argument("--input", required=True, help="입력 CSV 경로")
+    parser.add_argument(
+        "--input",
+        required=True,
+        help="입력 CSV 경로 (또는 .db/.sqlite/.sqlite3/.duckdb 파일 + --table/--query)",
+    )
     parser.add_argument(
         "--output",
         default="rank_race.mp4",
         help="출력 영상 파일 이름 (mp4)",
     )
+    parser.add_argument(
+        "--extra_output",
+        action="append",
+        default=None,
+        help=(
+            "같은 렌더링에서 함께 뽑을 추가 출력: 경로[@가로x세로] "
+            "(예: outputs/a_720p.mp4@1280x720, outputs/a.gif@640x360). 여러 번 지정 가능"
+        ),
+    )
+
+    # DB 입력 (SQLite/DuckDB)
+    parser.add_argument(
+        "--table",
+        default=None,
+        help="DB 입력일 때 읽을 테이블 이름",
+    )
+    parser.add_argument(
+        "--query",
+        default=None,
+        help="DB 입력일 때 사용할 SELECT 쿼리 (--table 대신)",
+    )
+    parser.add_argument(
+        "--db_top_k",
+        type=int,
+        default=None,
+        help=(
+            "DB 입력일 때 시점별 상위 K개만 SQL에서 잘라서 읽음 (보통 top_n 이상으로). "
+            "time_unit=raw, agg=last일 때만 적용"
+        ),
+    )
 
     # 컬럼 이름
     parser.add_argument(
@@ -63,6 +101,33 @@ def parse_args():
         help="이 시간(포함) 이전만 사용 (예: 2025-11-30)",
     )
 
+    # 값 저장 방식
+    parser.add_argument(
+        "--dtype",
+        choices=["float64", "float32", "int64"],
+        default="float64",
+        help=(
+            "값 저장 dtype: float64(기본), float32(메모리 절반), "
+            "int64(value_scale 단위로 반올림한 정수). 순위가 바뀔 위험이 있으면 경고"
+        ),
+    )
+    parser.add_argument(
+        "--value_scale",
+        type=float,
+        default=1_000_000,
+        help="값을 이 수로 나눠서 화면에 표시 (기본 1,000,000 = 백만 단위, 1이면 원본 그대로)",
+    )
+    parser.add_argument(
+        "--agg",
+        choices=["last", "sum", "max", "mean"],
+        default="last",
+        help=(
+            "같은 (time, entity) 칸(time_unit=day/month면 그 날/달)에 행이 여러 개일 때 "
+            "합치는 방법 (기본 last = 가장 늦은 시점의 행, 같은 시점이면 파일에서 마지막 행; "
+            "sum/max/mean은 칸 안의 모든 행, 이중 상장 합산은 sum)"
+        ),
+    )
+
     # 시각화 옵션
     parser.add_argument(
         "--top_n",
@@ -87,7 +152,53 @@ def parse_args():
         default=500,
         help="각 기간 보여주는 시간 (ms). 500이면 0.5초",
     )
-    
+    parser.add_argument(
+        "--interpolation",
+        choices=["fixed", "adaptive"],
+        default="fixed",
+        help=(
+            "보간 방식: fixed(모든 구간 steps_per_period), "
+            "adaptive(순위/값 변화가 큰 구간에 프레임을 더 주고 조용한 구간은 줄임)"
+        ),
+    )
+    parser.add_argument(
+        "--frame_budget",
+        type=int,
+        default=None,
+        help="adaptive 모드의 총 보간 프레임 수 (없으면 순위가 바뀌는 구간 수 기준으로 자동)",
+    )
+    parser.add_argument(
+        "--duration_budget",
+        type=float,
+        default=None,
+        help="adaptive 모드의 총 영상 길이 예산 (초). frame_budget이 있으면 무시",
+    )
+    parser.add_argument(
+        "--min_active_steps",
+        type=int,
+        default=None,
+        help=(
+            "adaptive 모드에서 순위가 바뀌는(추월) 구간의 최소 보간 프레임 수 "
+            "(기본: steps_per_period, 고정 방식과 같은 부드러움)"
+        ),
+    )
+    parser.add_argument(
+        "--end_pause",
+        type=int,
+        default=0,
+        help="마지막 기간에서 멈춰 있는 시간 (ms). 프레임을 다시 그리지 않고 인코더에서 늘림",
+    )
+    parser.add_argument(
+        "--frame_holds",
+        choices=["vfr", "cfr"],
+        default="vfr",
+        help=(
+            "변화 없는 연속 프레임 처리 (두 방식 모두 프레임은 한 번만 그려서 보냄): "
+            "vfr(앞 프레임 표시 시간을 늘림), "
+            "cfr(ffmpeg가 같은 프레임을 복제해서 고정 프레임레이트로 인코딩)"
+        ),
+    )
+
     # 스타일 선택
     parser.add_argument(
         "--style",
@@ -96,4 +207,18 @@ def parse_args():
         help="시각화 스타일 프리셋 선택 (기본: pastel_wood)",
     )
 
-    return parser.parse_args()
+    # 렌더링 엔진
+    parser.add_argument(
+        "--engine",
+        choices=["matplotlib", "raster"],
+        default="matplotlib",
+        help=(
+            "렌더링 엔진: matplotlib(bar_chart_race 기반, 기본), "
+            "raster(NumPy/Pillow로 직접 합성, 훨씬 빠름)"
+        ),
+    )
+
+    if defaults:
+        parser.set_defaults(**defaults)
+
+    return parser.parse_args(argv)
@@ -1,14 +1,17 @@
 # src/collect_korea_market_cap_monthly.py
 
 import argparse
+from collections import Counter
 from datetime import datetime, timedelta
 
 import pandas as pd
-from pykrx import stock
+
+from fetch_plan import STRATEGIES, candidate_count, plan_fetch, print_plan
+from market_snapshot_store import SnapshotStore
 
 def parse_args():
     parser = argparse.ArgumentParser(
-        description="국내 시가총액 월말 데이터 수집 (KOSPI 상위 20)"
+        description="국내 시가총액 월말 데이터 수집 (기본: KOSPI 상위 20)"
     )
     parser.add_argument(
         "--start",
@@ -25,16 +28,199 @@ def parse_args():
         default="data/korea_market_cap_monthly.csv",
         help="저장할 CSV 경로 (기본: data/korea_market_cap_monthly.csv)",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--market",
+        action="append",
+        choices=["KOSPI", "KOSDAQ", "KONEX"],
+        default=None,
+        help="수집할 시장 (여러 번 지정하면 합쳐서 순위 계산), 기본: KOSPI",
+    )
+    parser.add_argument(
+        "--top_n",
+        type=int,
+        default=20,
+        help="날짜별로 남길 시가총액 상위 종목 수 (기본: 20)",
+    )
+    parser.add_argument(
+        "--columns",
+        default=None,
+        help="원본 표에서 추가로 남길 컬럼 (쉼표 구분, 예: 종가,상장주식수)",
+    )
+    parser.add_argument(
+        "--snapshot_dir",
+        default="data/snapshots",
+        help="pykrx 원본 응답 스냅샷 저장 폴더 (기본: data/snapshots)",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="원격 호출 없이 스냅샷 저장소에 있는 데이터만 사용",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="저장된 스냅샷을 무시하고 다시 받아서 덮어씀 (--offline과 함께 쓸 수 없음)",
+    )
+    parser.add_argument(
+        "--strategy",
+        choices=STRATEGIES,
+        default="snapshot",
+        help=(
+            "수집 방식: snapshot(월말마다 시장 전체, 기본값), "
+            "ticker(앵커 스냅샷으로 고른 후보 종목별 기간 조회, 호출 수는 적지만 근사), "
+            "auto(구간별 예상 호출 수가 적은 쪽)"
+        ),
+    )
+    parser.add_argument(
+        "--churn",
+        type=float,
+        default=3.0,
+        help="1년에 상위 top_n에 새로 들어오는 종목 수 예상치 (ticker/auto의 앵커 간격과 비용 계산용, 기본: 3)",
+    )
+    parser.add_argument(
+        "--era_years",
+        type=int,
+        default=5,
+        help="수집 방식을 따로 정하는 구간 길이(년), 기본: 5",
+    )
+    args = parser.parse_args()
+    if args.offline and args.refresh:
+        parser.error("--offline과 --refresh는 함께 쓸 수 없습니다.")
+    return args
+
+
+class OfflineCacheMiss(RuntimeError):
+    """offline 실행인데 저장소에 필요한 응답이 없음 (불완전한 결과를 쓰지 않도록 중단)."""
+
+
+class PykrxBackend:
+    """
+    pykrx 호출 창구. 같은 메서드를 가진 가짜 백엔드로 바꿔 끼우면 원격 호출 없이 검증 가능.
+    pykrx는 실제로 호출할 때만 import (가짜 백엔드/offline 실행에는 설치가 필요 없음).
+    """
+
+    @staticmethod
+    def _stock():
+        from pykrx import stock
+        return stock
+
+    def market_cap_by_ticker(self, date_str, market):
+        return self._stock().get_market_cap_by_ticker(date_str, market=market)
+
+    def market_cap_by_date(self, from_str, to_str, ticker):
+        return self._stock().get_market_cap_by_date(from_str, to_str, ticker)
+
+    def ticker_name(self, ticker):
+        return self._stock().get_market_ticker_name(ticker)
+
+
+class CountingBackend:
+    """다른 백엔드를 감싸서 메서드별 호출 수를 셈."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = Counter()
+
+    def market_cap_by_ticker(self, date_str, market):
+        self.calls["market_cap_by_ticker"] += 1
+        return self.backend.market_cap_by_ticker(date_str, market)
+
+    def market_cap_by_date(self, from_str, to_str, ticker):
+        self.calls["market_cap_by_date"] += 1
+        return self.backend.market_cap_by_date(from_str, to_str, ticker)
+
+    def ticker_name(self, ticker):
+        self.calls["ticker_name"] += 1
+        return self.backend.ticker_name(ticker)
+
+    def report(self):
+        detail = ", ".join(f"{k} {v:,}" for k, v in sorted(self.calls.items()))
+        print(f"📞 pykrx 호출: 총 {sum(self.calls.values()):,}회" + (f" ({detail})" if detail else ""))
+
 
+PYKRX = PykrxBackend()
 
-def collect_for_market(date_str: str, market: str) -> pd.DataFrame:
+
+def fetch_market_cap_snapshot(date_str: str, market: str, store=None, offline=False,
+                              backend=None) -> pd.DataFrame:
+    """
+    get_market_cap_by_ticker 원본 응답(index=티커)을 반환.
+    store가 있으면 저장된 스냅샷을 먼저 쓰고, 없을 때만 pykrx를 호출해서 저장.
+    """
+    if store is not None and store.has(market, date_str, allow_stale=offline):
+        return store.load(market, date_str)
+
+    if offline:
+        raise OfflineCacheMiss(f"스냅샷 없음 (offline): {market} {date_str}")
+
+    raw = (backend or PYKRX).market_cap_by_ticker(date_str, market)
+    if store is not None:
+        store.save(market, date_str, raw, source="get_market_cap_by_ticker")
+    return raw
+
+
+def fetch_market_cap_range(from_str: str, to_str: str, ticker: str, market: str,
+                           store=None, offline=False, backend=None) -> pd.DataFrame:
+    """
+    get_market_cap_by_date 원본 응답(index=날짜, 종목 하나의 기간 전체)을 반환.
+    스냅샷과 같은 규칙으로 store에 캐시하고, 이 기간을 포함하는 더 넓은 조회가
+    저장돼 있으면 잘라서 사용.
+    """
+    if store is not None:
+        cached = store.find_range(market, ticker, from_str, to_str, allow_stale=offline)
+        if cached is not None:
+            raw = store.load_range(market, ticker, *cached)
+            return raw[(raw.index >= pd.Timestamp(from_str)) & (raw.index <= pd.Timestamp(to_str))]
+
+    if offline:
+        raise OfflineCacheMiss(f"기간 조회 결과 없음 (offline): {market} {ticker} {from_str}~{to_str}")
+
+    raw = (backend or PYKRX).market_cap_by_date(from_str, to_str, ticker)
+    if store is not None:
+        store.save_range(market, ticker, from_str, to_str, raw, source="get_market_cap_by_date")
+    return raw
+
+
+def _find_mcap_col(cols):
+    """pykrx 표에서 시가총액 컬럼 이름 찾기 (보통 '시가총액')."""
+    if "시가총액" in cols:
+        return "시가총액"
+    # 다른 이름으로 오는 경우가 있다면 여기서 추가로 처리
+    # 예: '시가총액(원)' 이런 식이면 startswith로 찾을 수도 있음
+    cand = [c for c in cols if "시가" in c and "총액" in c]
+    if cand:
+        return cand[0]
+    raise RuntimeError(f"'시가총액' 컬럼을 찾을 수 없습니다. columns={cols}")
+
+
+def lookup_ticker_name(ticker: str, store=None, offline=False, backend=None) -> str:
+    """티커 → 종목명. store에 캐시하고, offline이거나 실패하면 티커 그대로."""
+    if store is not None:
+        cached = store.ticker_names().get(ticker)
+        if cached:
+            return cached
+    if offline:
+        return ticker
+
+    try:
+        name = (backend or PYKRX).ticker_name(ticker)
+    except Exception:
+        return ticker  # 실패하면 그냥 티커 그대로
+
+    if store is not None and name:
+        store.save_ticker_names({ticker: name})
+    return name or ticker
+
+
+def collect_for_market(date_str: str, market: str, store=None, offline=False,
+                       columns=None, backend=None) -> pd.DataFrame:
     """
     특정 날짜(date_str, 'YYYYMMDD')와 시장(KOSPI/KOSDAQ)에 대해
     티커별 시가총액을 가져와서 표준 컬럼으로 변환.
     과거 일부 날짜에서 '종목명' 컬럼이 없을 수 있으므로 방어적으로 처리.
+    columns: 원본 표에서 추가로 남길 컬럼 이름 목록 (없는 컬럼은 무시)
     """
-    df = stock.get_market_cap_by_ticker(date_str, market=market)
+    df = fetch_market_cap_snapshot(date_str, market, store=store, offline=offline, backend=backend)
     # index: 티커, columns: 시가총액, 상장주식수, 종가 ...
     df = df.reset_index()  # index → '티커' 컬럼이 생김
 
@@ -52,40 +238,26 @@ def collect_for_market(date_str: str, market: str) -> pd.DataFrame:
 
     # 2) 시가총액 컬럼명 찾기
     # pykrx 기준으로는 보통 '시가총액'이지만, 혹시 다르면 여기서 매핑
-    if "시가총액" in cols:
-        mcap_col = "시가총액"
-    else:
-        # 다른 이름으로 오는 경우가 있다면 여기서 추가로 처리
-        # 예: '시가총액(원)' 이런 식이면 startswith로 찾을 수도 있음
-        cand = [c for c in cols if "시가" in c and "총액" in c]
-        if cand:
-            mcap_col = cand[0]
-        else:
-            raise RuntimeError(f"'시가총액' 컬럼을 찾을 수 없습니다. columns={cols}")
+    mcap_col = _find_mcap_col(cols)
 
     # 3) 종목명 컬럼이 있으면 사용, 없으면 나중에 pykrx에 다시 물어봐서 채움
     has_name = "종목명" in cols
+    extra_cols = [c for c in (columns or []) if c in cols and c not in (ticker_col, "종목명", mcap_col)]
 
     if has_name:
-        df = df[[ticker_col, "종목명", mcap_col]]
-        df.columns = ["ticker", "name", "market_cap"]
+        df = df[[ticker_col, "종목명", mcap_col] + extra_cols]
+        df.columns = ["ticker", "name", "market_cap"] + extra_cols
     else:
         # 일단 티커, 시가총액만
-        df = df[[ticker_col, mcap_col]]
-        df.columns = ["ticker", "market_cap"]
+        df = df[[ticker_col, mcap_col] + extra_cols]
+        df.columns = ["ticker", "market_cap"] + extra_cols
 
-        # 종목명 보강 시도
-        names = []
-        for t in df["ticker"]:
-            try:
-                nm = stock.get_market_ticker_name(t)
-            except Exception:
-                nm = t  # 실패하면 그냥 티커 그대로
-            names.append(nm)
-        df["name"] = names
+        # 종목명 보강 시도 (비거래일 0 데이터는 빼고, 종목명 캐시 사용)
+        df = df[df["market_cap"] > 0]
+        df["name"] = [lookup_ticker_name(t, store, offline, backend) for t in df["ticker"]]
 
         # 컬럼 순서 맞추기
-        df = df[["ticker", "name", "market_cap"]]
+        df = df[["ticker", "name", "market_cap"] + extra_cols]
 
     # 날짜/시장 정보 추가
     df["date"] = datetime.strptime(date_str, "%Y%m%d").strftime("%Y-%m-%d")
@@ -94,68 +266,230 @@ def collect_for_market(date_str: str, market: str) -> pd.DataFrame:
     return df
 
 
-def main():
-    args = parse_args()
+def _snapshot_on_or_before(dt, markets, store=None, offline=False, columns=None,
+                           backend=None):
+    """
+    dt(월말)부터 하루씩 거슬러 올라가며 시장 전체 스냅샷을 찾음 (최대 31일).
+    반환: (시가총액 > 0인 종목 전체 DataFrame, 실제 사용한 날짜) / 못 찾으면 (None, None)
+    """
+    fallback_date = dt
 
-    market = "kospi"
-    top_n = 20
+    for _ in range(31):
+        date_str = fallback_date.strftime("%Y%m%d")
 
-    start = pd.to_datetime(args.start)
-    end = pd.to_datetime(args.end) if args.end else datetime.today()
+        try:
+            day_df = pd.concat(
+                [
+                    collect_for_market(date_str, m.upper(), store, offline, columns, backend)
+                    for m in markets
+                ],
+                ignore_index=True,
+            )
 
-    # 월말 기준 날짜 생성
-    dates = pd.date_range(start=start, end=end, freq="M")
+            # 비거래일에는 0으로 채워진 데이터가 내려올 수 있으므로 제거 후 검증
+            day_df = day_df[day_df["market_cap"] > 0]
+            if day_df.empty:
+                raise RuntimeError("유효한 시가총액 데이터가 없습니다.")
 
-    records = []
+            return day_df, fallback_date
 
-    print(f"📅 기간: {dates[0].strftime('%Y-%m-%d')} ~ {dates[-1].strftime('%Y-%m-%d')}")
-    print("📈 시장: KOSPI (상위 20 종목만 수집)")
+        except OfflineCacheMiss:
+            raise
+        except Exception as e:
+            fallback_date -= timedelta(days=1)
 
-    for dt in dates:
-        date_str = dt.strftime("%Y%m%d")
+    return None, None
+
+
+def _collect_by_snapshot(plan, markets, top_n, columns, store, offline, backend):
+    """월말마다 시장 전체 스냅샷 1건 → 상위 top_n."""
+    records = []
+
+    for dt in plan.dates:
         pretty = dt.strftime("%Y-%m-%d")
         print(f"  → {pretty} 수집 중...")
 
-        fallback_date = dt
-        fallback_used = False
+        month_df, used = _snapshot_on_or_before(dt, markets, store, offline, columns, backend)
+        if month_df is None:
+            print(f"    ! {pretty} 수집 실패: 직전 31일 내 데이터 없음")
+            continue
+
+        if used != dt:
+            print(
+                f"    • {pretty} 데이터 없음 → {used.strftime('%Y-%m-%d')} (이전 영업일)로 대체"
+            )
 
-        for _ in range(31):
-            date_str = fallback_date.strftime("%Y%m%d")
+        records.append(month_df.nlargest(top_n, "market_cap"))
 
+    return records
+
+
+def _collect_by_ticker(plan, markets, top_n, columns, store, offline, backend):
+    """
+    plan.anchors 월말 스냅샷(앵커)에서 후보 종목을 고르고,
+    후보 종목마다 구간 전체 시가총액을 한 번에 받아서 월말별 상위 top_n을 만듦.
+    월말이 휴일이면 스냅샷 방식과 같게 '그 날 이전 마지막 영업일' 값을 씀.
+    기간 조회는 달력 기준 구간 시작부터 받아서 --start를 바꿔도 같은 캐시를 씀.
+    """
+    dates = plan.dates
+    first, last = dates[0], dates[-1]
+    from_str = (datetime(plan.first_year, 1, 1) - timedelta(days=31)).strftime("%Y%m%d")
+    to_str = last.strftime("%Y%m%d")
+    n_candidates = candidate_count(top_n)
+
+    series = []
+    for m in markets:
+        m = m.upper()
+
+        # 1) 앵커 스냅샷에서 후보 종목 (티커 → 종목명)
+        candidates = {}
+        for dt in plan.anchors:
+            anchor_df, _ = _snapshot_on_or_before(dt, [m], store, offline, None, backend)
+            if anchor_df is None:
+                continue
+            top = anchor_df.nlargest(n_candidates, "market_cap")
+            candidates.update(zip(top["ticker"], top["name"]))
+
+        print(
+            f"  → {first.strftime('%Y-%m')} ~ {last.strftime('%Y-%m')} {m}: "
+            f"후보 {len(candidates)}종목 기간 조회 중..."
+        )
+
+        # 2) 후보 종목별 기간 조회
+        for ticker, name in candidates.items():
             try:
-                month_df = collect_for_market(date_str, market.upper())
+                raw = fetch_market_cap_range(
+                    from_str, to_str, ticker, m, store, offline, backend
+                )
+            except OfflineCacheMiss:
+                raise
+            except Exception as e:
+                print(f"    ! {ticker} 기간 조회 실패: {e}")
+                continue
+            if raw.empty:
+                continue
+
+            raw = raw.rename_axis("date").reset_index()
+            mcap_col = _find_mcap_col(raw.columns.tolist())
+            extra_cols = [c for c in (columns or []) if c in raw.columns and c != mcap_col]
+
+            df = raw[["date", mcap_col] + extra_cols].rename(columns={mcap_col: "market_cap"})
+            df["date"] = pd.to_datetime(df["date"])
+            df["ticker"] = ticker
+            df["name"] = name
+            df["market"] = m
+            series.append(df)
+
+    if not series:
+        print(f"    ! {first.strftime('%Y-%m')} ~ {last.strftime('%Y-%m')} 수집 실패: 후보 종목 없음")
+        return []
+
+    long = pd.concat(series, ignore_index=True)
+    long = long[long["market_cap"] > 0]
+
+    # 기간 조회 결과에 없는 요청 컬럼(예: 종가)은 빈 값으로 맞춰서 스키마 통일
+    for c in columns or []:
+        if c not in long.columns:
+            long[c] = pd.NA
+
+    # 3) 월말별로 그 날 이전 마지막 영업일 하나를 골라서 상위 top_n
+    records = []
+    for dt in dates:
+        window = long[(long["date"] <= dt) & (long["date"] > dt - timedelta(days=31))]
+        if window.empty:
+            print(f"    ! {dt.strftime('%Y-%m-%d')} 수집 실패: 직전 31일 내 데이터 없음")
+            continue
 
-                # 비거래일에는 0으로 채워진 데이터가 내려올 수 있으므로 제거 후 검증
-                month_df = month_df[month_df["market_cap"] > 0]
-                if month_df.empty:
-                    raise RuntimeError("유효한 시가총액 데이터가 없습니다.")
+        day = window["date"].max()
+        month_df = window[window["date"] == day].nlargest(top_n, "market_cap").copy()
+        month_df["date"] = day.strftime("%Y-%m-%d")
+        records.append(
+            month_df[["ticker", "name", "market_cap"] + list(columns or []) + ["date", "market"]]
+        )
 
-                month_df = month_df.nlargest(top_n, "market_cap")
+    return records
 
-                if fallback_used:
-                    used_date = fallback_date.strftime("%Y-%m-%d")
-                    print(
-                        f"    • {pretty} 데이터 없음 → {used_date} (이전 영업일)로 대체"
-                    )
 
-                records.append(month_df)
-                break
+def collect_monthly(start="1995-01-01", end=None, market="kospi", top_n=20,
+                    columns=None, store=None, offline=False, strategy="snapshot",
+                    churn=3.0, era_years=5, backend=None) -> pd.DataFrame:
+    """
+    월말 기준 시가총액 상위 top_n 종목을 모아서 DataFrame으로 반환.
+    컬럼: ticker, name, market_cap, date, market (CSV로 저장하는 형식과 동일) + columns
+    수집된 데이터가 없으면 빈 DataFrame.
+
+    market: "KOSPI" 같은 문자열 또는 리스트 (여러 시장이면 합쳐서 상위 top_n)
+    store: SnapshotStore — 원본 응답을 캐시해서 다른 설정으로 다시 돌려도 원격 호출 없음
+    offline: True면 store에 있는 스냅샷만 사용
+    strategy: "snapshot"(기본, 정확) / "ticker" / "auto" (fetch_plan 참고, churn은 앵커 간격과 비용 계산용)
+    backend: pykrx 호출 창구 (기본 PykrxBackend, 호출 수를 보려면 CountingBackend로 감쌈)
+    """
+    markets = [market] if isinstance(market, str) else list(market)
+    start = pd.to_datetime(start)
+    end = pd.to_datetime(end) if end else datetime.today()
 
-            except Exception as e:
-                fallback_date -= timedelta(days=1)
-                fallback_used = True
-        else:
-            print(f"    ! {pretty} 수집 실패: 직전 31일 내 데이터 없음")
-            continue
+    # 월말 기준 날짜 생성
+    dates = pd.date_range(start=start, end=end, freq="M")
+
+    print(f"📅 기간: {dates[0].strftime('%Y-%m-%d')} ~ {dates[-1].strftime('%Y-%m-%d')}")
+    print(f"📈 시장: {'+'.join(m.upper() for m in markets)} (상위 {top_n} 종목만 수집)")
+
+    is_cached = None
+    if store is not None:
+        is_cached = lambda d: all(store.has(m.upper(), d, allow_stale=offline) for m in markets)
+
+    plans = plan_fetch(
+        dates, len(markets), top_n, churn,
+        era_years=era_years, strategy=strategy, is_cached=is_cached,
+    )
+    print_plan(plans)
+
+    records = []
+    for plan in plans:
+        collect = _collect_by_ticker if plan.strategy == "ticker" else _collect_by_snapshot
+        records += collect(plan, markets, top_n, columns, store, offline, backend)
 
     if not records:
-        print("❌ 수집된 데이터가 없습니다.")
-        return
+        return pd.DataFrame(
+            columns=["ticker", "name", "market_cap"] + list(columns or []) + ["date", "market"]
+        )
 
     full = pd.concat(records, ignore_index=True)
 
     # 정렬: 날짜 ↑, 시가총액 ↓
-    full = full.sort_values(["date", "market_cap"], ascending=[True, False])
+    return full.sort_values(["date", "market_cap"], ascending=[True, False])
+
+
+def main():
+    args = parse_args()
+
+    columns = [c.strip() for c in args.columns.split(",")] if args.columns else None
+    backend = CountingBackend(PykrxBackend())
+
+    try:
+        full = collect_monthly(
+            args.start,
+            args.end,
+            market=args.market or ["KOSPI"],
+            top_n=args.top_n,
+            columns=columns,
+            store=SnapshotStore(args.snapshot_dir, refresh=args.refresh),
+            offline=args.offline,
+            strategy=args.strategy,
+            churn=args.churn,
+            era_years=args.era_years,
+            backend=backend,
+        )
+    except OfflineCacheMiss as e:
+        # 일부 종목/날짜가 빠진 CSV를 조용히 쓰지 않도록 저장 없이 종료
+        print(f"❌ {e}")
+        print("   저장소에 없는 데이터가 있어 CSV를 저장하지 않았습니다. --offline 없이 다시 실행하세요.")
+        raise SystemExit(1)
+    backend.report()
+
+    if full.empty:
+        print("❌ 수집된 데이터가 없습니다.")
+        return
 
     # CSV 저장
     output_path = args.output
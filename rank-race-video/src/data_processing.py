@@ -3,21 +3,236 @@
 import pandas as pd
 import numpy as np
 
+from db_source import detect_db_kind, read_database
+
+# 값 저장 dtype 정책: float64(기본), float32(메모리 절반), int64(화면 단위로 반올림한 정수)
+VALUE_DTYPES = ("float64", "float32", "int64")
+
+# 같은 (time, entity) 칸에 여러 행이 있을 때 합치는 방법
+# (last: 가장 늦은 시점의 행, 같은 시점이면 파일 순서상 마지막 행)
+AGG_FUNCS = ("last", "sum", "max", "mean")
+
+# float32가 정수 자릿수를 정확히 표현할 수 있는 한계 (2^24)
+_FLOAT32_EXACT_INT = 2 ** 24
+
+
+def report_bytes(stage, nbytes):
+    """파이프라인 단계별 메모리 사용량 출력."""
+    print(f"[메모리] {stage}: {nbytes / 1024 ** 2:,.2f} MB")
+
+
+def to_compact_values(raw, dtype="float64", value_scale=1):
+    """
+    원본 값을 화면 단위(raw / value_scale)로 바꾸고 dtype 정책에 맞게 변환.
+    스케일링은 여기서 한 번만 하고, 이후 단계에서는 다시 나누지 않음.
+
+    반환: (compact 값 배열, 스케일만 적용한 float64 배열(정밀도 검사용))
+    """
+    if dtype not in VALUE_DTYPES:
+        raise ValueError(f"지원하지 않는 dtype입니다: {dtype} (가능: {VALUE_DTYPES})")
+
+    scaled = np.array(raw, dtype=np.float64)  # 원본 Series와 메모리를 공유하지 않도록 새 배열
+    if value_scale != 1:
+        scaled /= value_scale
+
+    if dtype == "int64":
+        compact = np.rint(np.nan_to_num(scaled, nan=0.0)).astype(np.int64)
+    elif dtype == "float32":
+        compact = scaled.astype(np.float32)
+    else:
+        compact = scaled
+
+    return compact, scaled
+
+
+def check_rank_precision(time_codes, scaled, compact, dtype):
+    """
+    compact dtype으로 바꾸면서 같은 시점 안의 순위가 바뀔 수 있는지 검사하고 경고.
+    (원래는 a > b였는데 변환 후 a <= b가 되는 인접 쌍이 있는지)
+    """
+    if compact is scaled or len(scaled) < 2:
+        return 0
+
+    exact = np.nan_to_num(scaled, nan=0.0)
+    order = np.lexsort((-exact, time_codes))
+    t = time_codes[order]
+    s = exact[order]
+    c = compact[order].astype(np.float64)
+
+    collide = (t[1:] == t[:-1]) & (s[:-1] > s[1:]) & (c[:-1] <= c[1:])
+    n_periods = len(np.unique(t[1:][collide]))
+    if n_periods:
+        print(
+            f"[경고] dtype={dtype} 변환으로 {n_periods}개 시점에서 순위가 뒤바뀌거나 "
+            "동점이 될 수 있습니다. value_scale을 줄이거나 float64를 사용하세요."
+        )
+
+    if dtype == "float32" and np.nanmax(np.abs(exact)) > _FLOAT32_EXACT_INT:
+        print(
+            "[경고] float32로는 2^24(약 1,677만)보다 큰 값의 끝자리가 정확하지 않아 "
+            "막대 숫자 라벨이 달라질 수 있습니다."
+        )
+    return n_periods
+
+
+def _reduce_cells(keys, values, agg):
+    """같은 칸 번호(keys)의 값들을 agg로 합침. 반환: (정렬된 고유 칸 번호, 칸별 값)"""
+    if agg == "last":
+        # 뒤집은 배열에서 처음 나오는 위치 = 원래 순서에서 마지막 행 (return_index는 stable 정렬)
+        cells, first = np.unique(keys[::-1], return_index=True)
+        return cells, values[::-1][first]
+
+    cells, inverse = np.unique(keys, return_inverse=True)
+    if agg == "max":
+        out = np.full(len(cells), -np.inf)
+        np.maximum.at(out, inverse, values)
+        return cells, out
+
+    out = np.bincount(inverse, weights=values, minlength=len(cells))
+    if agg == "mean":
+        out /= np.bincount(inverse, minlength=len(cells))
+    return cells, out
+
+
+def aggregate_cells(times, entities, values, agg="last", time_unit="raw"):
+    """
+    (time, entity)를 정수 코드로 바꾸고, 같은 칸에 들어가는 중복 행을 agg로 합침.
+    df.pivot과 달리 중복(정정 데이터, 장중 여러 행, 이중 상장 등)이 있어도 실패하지 않음.
+
+    time_unit="day"/"month"(times가 datetime일 때)면 시간을 날짜/월말로 묶고,
+    sum/max/mean은 그 기간 안의 모든 행을 합침 (장중 여러 행도 포함).
+    agg=last는 day/month 모두 '가장 늦은 시점, 같은 시점이면 파일에서 마지막 행'
+    (month는 groupby(entity).resample("M").last()와 같은 기준).
+    결측 값은 집계에서 빠지고, 값이 하나도 없는 칸은 피벗에서 0이 됨.
+
+    반환: (t_uniques, e_uniques, cells, cell_values)
+      - cells: 칸 번호(time_code * entity 수 + entity_code), 오름차순
+      - cell_values: 칸별 집계 값 (float64)
+    """
+    if agg not in AGG_FUNCS:
+        raise ValueError(f"지원하지 않는 agg입니다: {agg} (가능: {AGG_FUNCS})")
+
+    values = np.asarray(values, dtype=np.float64)
+    e_codes, e_uniques = pd.factorize(entities, sort=True)
+
+    bucketed = time_unit in ("day", "month")
+    if bucketed:
+        times = pd.DatetimeIndex(times)
+
+    if time_unit == "month":
+        months = times.normalize() + pd.offsets.MonthEnd(0)
+        if months.notna().any():
+            t_uniques = pd.date_range(months.min(), months.max(), freq="M")
+        else:
+            t_uniques = pd.DatetimeIndex([])
+        t_codes = np.where(months.isna(), -1, t_uniques.searchsorted(months))
+    elif time_unit == "day":
+        t_codes, t_uniques = pd.factorize(times.normalize(), sort=True)
+    else:
+        t_codes, t_uniques = pd.factorize(times, sort=True)
+
+    valid = (t_codes >= 0) & (e_codes >= 0) & ~np.isnan(values)
+    keys = t_codes[valid].astype(np.int64) * len(e_uniques) + e_codes[valid]
+    values = values[valid]
+
+    if bucketed and agg == "last":
+        # 시점 순으로 안정 정렬 → 칸별 마지막 행 = 가장 늦은 시점 (같은 시점이면 파일 순서)
+        order = np.argsort(times.asi8[valid], kind="stable")
+        keys, values = keys[order], values[order]
+
+    cells, cell_values = _reduce_cells(keys, values, agg)
+
+    n_dup = len(keys) - len(cells)
+    if n_dup:
+        print(f"중복 (time, entity) 행 {n_dup:,}개를 합침 (agg={agg})")
+
+    return t_uniques, e_uniques, cells, cell_values
+
+
+def _pivot_matrix(t_uniques, e_uniques, cells, values, time_col, entity_col):
+    """
+    aggregate_cells 결과를 values dtype 그대로 미리 잡아둔 2차원 행렬에 배치 (빈 칸은 0).
+    """
+    mat = np.zeros((len(t_uniques), len(e_uniques)), dtype=values.dtype)
+    mat.ravel()[cells] = values
+
+    return pd.DataFrame(
+        mat,
+        index=pd.Index(t_uniques, name=time_col),
+        columns=pd.Index(e_uniques, name=entity_col),
+        copy=False,
+    )
+
 
 def load_and_prepare_data(args):
     """
-    CSV를 읽고, 시간 파싱 + 기간 필터 + 단위 변환 + 피벗까지 처리.
+    CSV(또는 SQLite/DuckDB)를 읽고, 시간 파싱 + 기간 필터 + 단위 변환 + 피벗까지 처리.
     반환:
       - pivot: index=시간, columns=entity, values=value 형태의 DataFrame
       - period_fmt: bar_chart_race에서 쓸 기간 포맷 문자열 (또는 None)
     """
-    df = pd.read_csv(args.input)
+    if detect_db_kind(args.input):
+        # SQLite/DuckDB: 컬럼/기간/상위 K 필터를 SQL로 내려보내서 필요한 행만 읽음
+        top_k = getattr(args, "db_top_k", None)
+        agg = getattr(args, "agg", "last")
+        if top_k is not None and (args.time_unit != "raw" or agg != "last"):
+            # 상위 K는 원본 시점별 행 순위로 자르므로, 날/달로 묶거나 중복 행을 합치기 전에
+            # 장중 행이나 이중 상장의 두 번째 행을 버려서 결과가 달라질 수 있음
+            print(
+                "[경고] --db_top_k는 time_unit=raw, agg=last에서만 적용됩니다 "
+                f"(지금: time_unit={args.time_unit}, agg={agg}). 상위 K 자르기 없이 읽습니다."
+            )
+            top_k = None
+        df = read_database(
+            args.input,
+            time_col=args.time_col,
+            entity_col=args.entity_col,
+            value_col=args.value_col,
+            table=getattr(args, "table", None),
+            query=getattr(args, "query", None),
+            time_format=args.time_format,
+            start_time=args.start_time,
+            end_time=args.end_time,
+            top_k=top_k,
+        )
+    else:
+        df = pd.read_csv(args.input)
 
-    time_col = args.time_col
+    return prepare_dataframe(
+        df,
+        time_col=args.time_col,
+        entity_col=args.entity_col,
+        value_col=args.value_col,
+        time_format=args.time_format,
+        time_unit=args.time_unit,
+        start_time=args.start_time,
+        end_time=args.end_time,
+        dtype=getattr(args, "dtype", "float64"),
+        value_scale=getattr(args, "value_scale", 1_000_000),
+        agg=getattr(args, "agg", "last"),
+    )
+
+
+def prepare_dataframe(df, time_col="time", entity_col="entity", value_col="value",
+                      time_format=None, time_unit="raw", start_time=None, end_time=None,
+                      dtype="float64", value_scale=1_000_000, agg="last"):
+    """
+    이미 메모리에 있는 long 형태 DataFrame(또는 pyarrow Table)을
+    load_and_prepare_data와 같은 방식으로 pivot + period_fmt로 변환.
+
+    같은 (time, entity)에 여러 행이 있으면 agg(last/sum/max/mean)로 합침.
+    값은 여기서 한 번만 value_scale로 나누고(기본: 백만 단위) dtype 정책으로 변환.
+    """
+    if hasattr(df, "to_pandas") and not isinstance(df, pd.DataFrame):
+        # pyarrow.Table 등: 필요한 컬럼만 골라서 변환
+        df = df.select([time_col, entity_col, value_col]).to_pandas()
+    else:
+        # 호출한 쪽 DataFrame은 건드리지 않도록 필요한 컬럼만 골라서 사용
+        df = df[[time_col, entity_col, value_col]].copy()
 
     # 1) 시간 컬럼 파싱
-    if args.time_format:
-        df[time_col] = pd.to_datetime(df[time_col], format=args.time_format)
+    if time_format:
+        df[time_col] = pd.to_datetime(df[time_col], format=time_format)
     else:
         try:
             df[time_col] = pd.to_datetime(df[time_col], errors="raise")
@@ -30,50 +245,49 @@ def load_and_prepare_data(args):
     is_datetime = np.issubdtype(df[time_col].dtype, np.datetime64)
 
     # 2) 기간 필터
-    if is_datetime and args.start_time is not None:
-        start = pd.to_datetime(args.start_time)
+    if is_datetime and start_time is not None:
+        start = pd.to_datetime(start_time)
         df = df[df[time_col] >= start]
 
-    if is_datetime and args.end_time is not None:
-        end = pd.to_datetime(args.end_time)
+    if is_datetime and end_time is not None:
+        end = pd.to_datetime(end_time)
         df = df[df[time_col] <= end]
 
-    # 3) 시간 단위 변환
-    if is_datetime:
-        if args.time_unit == "day":
-            # 일 단위: 시간 정보 제거
-            df[time_col] = df[time_col].dt.normalize()
-
-        elif args.time_unit == "month":
-            # 월 단위: 각 entity별 월말 값(last) 사용
-            df = (
-                df.set_index(time_col)
-                .groupby(args.entity_col)[args.value_col]
-                .resample("M")
-                .last()
-                .reset_index()
-            )
-    else:
-        if args.time_unit in ["day", "month"]:
-            print(
-                "[경고] time_unit이 day/month로 설정됐지만 시간 컬럼이 datetime이 아니어서 "
-                "단위 변환을 생략합니다. 원본 값(raw) 그대로 사용합니다."
-            )
+    # 3) 시간 단위 변환: day/month(각 entity별 그 기간 마지막 시점 값)는 아래 집계 단계에서 같이 처리
+    if not is_datetime and time_unit in ["day", "month"]:
+        print(
+            "[경고] time_unit이 day/month로 설정됐지만 시간 컬럼이 datetime이 아니어서 "
+            "단위 변환을 생략합니다. 원본 값(raw) 그대로 사용합니다."
+        )
+
+    report_bytes("입력 (time/entity/value)", df.memory_usage(deep=False).sum())
 
-    # 4) 정렬
-    df = df.sort_values([time_col, args.entity_col])
+    # 4) 정수 코드 + 중복 (time, entity) 집계 (day/month면 날짜/월말로 묶으면서 같이)
+    t_uniques, e_uniques, cells, cell_values = aggregate_cells(
+        df[time_col],
+        df[entity_col],
+        df[value_col].to_numpy(dtype=np.float64, na_value=np.nan),
+        agg=agg,
+        time_unit=time_unit if is_datetime else "raw",
+    )
 
-    # 5) 피벗: index=시간, columns=entity, values=값
-    pivot = df.pivot(index=time_col, columns=args.entity_col, values=args.value_col)
+    # 5) 값 스케일링 + dtype 정책 적용 (파이프라인 전체에서 한 번만)
+    compact, scaled = to_compact_values(cell_values, dtype, value_scale)
+    check_rank_precision(cells // max(len(e_uniques), 1), scaled, compact, dtype)
+    del scaled, cell_values
 
-    # 6) 시간 순 정렬 + 결측값 처리
-    pivot = pivot.sort_index().fillna(0)
+    # 6) 피벗: index=시간(정렬), columns=entity(정렬), values=값 (빈 칸은 0)
+    pivot = _pivot_matrix(
+        t_uniques, e_uniques, cells, compact, time_col, entity_col
+    )
+    report_bytes(f"피벗 ({pivot.shape[0]}x{pivot.shape[1]}, {compact.dtype})",
+                 pivot.to_numpy().nbytes)
 
     # 7) period_fmt 결정 (bar_chart_race에서 화면에 찍을 형식)
     if np.issubdtype(pivot.index.dtype, np.datetime64):
-        if args.time_unit == "month":
+        if time_unit == "month":
             period_fmt = "%Y-%m"
-        elif args.time_unit == "day":
+        elif time_unit == "day":
             period_fmt = "%Y-%m-%d"
         else:
             period_fmt = "%Y-%m-%d"
@@ -0,0 +1,211 @@
+# src/db_source.py
+"""
+로컬 SQLite / DuckDB 파일을 입력으로 읽는 모듈.
+
+CSV로 내보냈다가 다시 읽는 대신, 필요한 것만 SQL로 바로 가져옴.
+  - 컬럼: time/entity/value 세 개만 SELECT
+  - 기간 필터(--start_time/--end_time): 안전하게 비교할 수 있을 때만 WHERE 절로 내려보냄
+    (DATE/TIMESTAMP 컬럼, --time_format으로 저장 형식을 알려준 문자열 컬럼,
+     또는 모든 값이 ISO-8601 날짜(YYYY-MM-DD...)로 시작하는 문자열 컬럼)
+  - 시점별 상위 K개(--db_top_k): ROW_NUMBER() 윈도 함수로 DB에서 잘라냄
+→ pandas로 넘어오는 행 수가 테이블 크기가 아니라 화면에 그릴 양에 비례.
+
+duckdb는 선택 의존성 (.duckdb 파일을 쓸 때만 필요).
+"""
+
+import datetime as _dt
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+_DB_KINDS = {
+    ".db": "sqlite",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite",
+    ".duckdb": "duckdb",
+}
+
+
+def detect_db_kind(path):
+    """확장자로 DB 종류 판별 ('sqlite' / 'duckdb'), DB가 아니면 None."""
+    return _DB_KINDS.get(os.path.splitext(str(path))[1].lower())
+
+
+def _quote(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _connect(path, kind):
+    if kind == "duckdb":
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError(
+                "DuckDB 파일을 읽으려면 duckdb 패키지가 필요합니다: pip install duckdb"
+            )
+        return duckdb.connect(str(path), read_only=True)
+
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def _fetch_df(con, kind, sql, params):
+    if kind == "duckdb":
+        return con.execute(sql, params).df()
+    return pd.read_sql_query(sql, con, params=params)
+
+
+# 저장 형식이 시간 순서와 같은 문자열 순서를 갖는지 확인할 때 쓰는 시각들 (오름차순)
+_ORDER_PROBES = pd.to_datetime([
+    "1999-12-31 23:59:59", "2000-01-01 00:00:00", "2000-01-01 09:05:07",
+    "2000-01-09 10:00:00", "2000-01-10 00:00:00", "2000-02-01 00:00:00",
+    "2000-10-01 00:00:00", "2000-11-30 00:00:00", "2001-01-01 00:00:00",
+    "2010-01-01 00:00:00",
+])
+
+
+def _is_native_datetime(sample):
+    """DB가 DATE/TIMESTAMP 타입으로 돌려준 값인지 (SQLite는 항상 문자열/숫자라 False)."""
+    return isinstance(sample, (_dt.date, np.datetime64))
+
+
+def _is_sortable_format(time_format):
+    """time_format 문자열의 사전순 비교가 시간 순서와 어긋나지 않는지 (예: %Y%m%d는 O, %d/%m/%Y는 X)."""
+    texts = [t.strftime(time_format) for t in _ORDER_PROBES]
+    return all(a <= b for a, b in zip(texts, texts[1:]))
+
+
+# 문자열 시간 값이 ISO-8601 날짜로 시작하는지 (SQLite/DuckDB 공통 GLOB 패턴)
+_ISO_DATE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
+
+
+def _is_iso_column(con, kind, source_sql, time_col):
+    """
+    NULL이 아닌 모든 값이 한 가지 ISO-8601 형태('YYYY-MM-DD' 또는 'YYYY-MM-DD[ T]...')인지.
+    길이와 구분자까지 모두 같아야 pandas가 형식 하나로 전부 파싱하므로 (섞여 있으면 pandas는
+    시간 파싱을 포기하고 필터 없이 쓰기 때문에 내려보내면 안 됨) 한 번 훑어서 확인.
+    """
+    text = f"CAST({_quote(time_col)} AS TEXT)"
+    probe = _fetch_df(
+        con, kind,
+        f"SELECT COUNT(*), "
+        f"SUM(CASE WHEN {text} GLOB ? OR {text} GLOB ? THEN 1 ELSE 0 END), "
+        f"MIN(LENGTH({text})), MAX(LENGTH({text})), "
+        f"MIN(SUBSTR({text}, 11, 1)), MAX(SUBSTR({text}, 11, 1)) "
+        f"FROM {source_sql} WHERE {_quote(time_col)} IS NOT NULL",
+        [_ISO_DATE_GLOB, _ISO_DATE_GLOB + "[ T]*"],
+    )
+    n, n_iso, min_len, max_len, min_sep, max_sep = probe.iloc[0].tolist()
+    return bool(n) and n == n_iso and min_len == max_len and min_sep == max_sep
+
+
+def _time_bounds(sample, start_time, end_time, time_format, iso_column=False):
+    """
+    WHERE 절로 내려보낼 (start, end, end_exclusive) 경계값.
+    안전하지 않으면 (None, None, False) (pandas 필터만 사용).
+
+    pushdown은 CSV 경로(pandas 필터)가 남기는 행을 절대 빼면 안 되므로:
+      - DATE/TIMESTAMP 컬럼: datetime 값으로 그대로 비교
+      - 문자열 컬럼: --time_format이 있고 그 형식이 사전순 = 시간순일 때만
+        (형식이 시간을 단조롭게 보존하므로 t <= end → f(t) <= f(end))
+      - --time_format 없는 ISO-8601 문자열 컬럼(iso_column): 날짜 단위로 넓혀서
+        t >= 'start 날짜', t < 'end 다음 날' (뒤에 붙은 시각과 무관하게 사전순 = 시간순)
+      - 그 밖(형식을 모르는 문자열, 정수 연도 등): 내려보내지 않음
+    """
+    end_exclusive = False
+    if _is_native_datetime(sample):
+        convert_start = convert_end = lambda v: pd.to_datetime(v).to_pydatetime()
+    elif isinstance(sample, str) and time_format and _is_sortable_format(time_format):
+        convert_start = convert_end = lambda v: pd.to_datetime(v).strftime(time_format)
+    elif isinstance(sample, str) and not time_format and iso_column:
+        convert_start = lambda v: pd.to_datetime(v).strftime("%Y-%m-%d")
+        convert_end = lambda v: (
+            pd.to_datetime(v).normalize() + pd.Timedelta(days=1)
+        ).strftime("%Y-%m-%d")
+        end_exclusive = True
+    else:
+        return None, None, False
+
+    start = convert_start(start_time) if start_time is not None else None
+    end = convert_end(end_time) if end_time is not None else None
+    return start, end, end_exclusive
+
+
+def build_query(source_sql, time_col, entity_col, value_col,
+                start=None, end=None, top_k=None, end_exclusive=False):
+    """
+    pushdown SQL과 파라미터 생성.
+    source_sql은 이미 quote된 테이블 이름 또는 '(서브쿼리) AS src'.
+    top_k는 원본 시점별 순위로 자르므로, 호출하는 쪽에서 time_unit=raw, agg=last일 때만 넘김.
+    """
+    t, e, v = _quote(time_col), _quote(entity_col), _quote(value_col)
+
+    where, params = [], []
+    if start is not None:
+        where.append(f"{t} >= ?")
+        params.append(start)
+    if end is not None:
+        where.append(f"{t} < ?" if end_exclusive else f"{t} <= ?")
+        params.append(end)
+    where_sql = f" WHERE {' AND '.join(where)}" if where else ""
+
+    sql = f"SELECT {t}, {e}, {v} FROM {source_sql}{where_sql}"
+
+    if top_k is not None:
+        sql = (
+            f"SELECT {t}, {e}, {v} FROM ("
+            f"SELECT {t}, {e}, {v}, "
+            f"ROW_NUMBER() OVER (PARTITION BY {t} ORDER BY {v} DESC) AS _rank_in_period "
+            f"FROM {source_sql}{where_sql}"
+            f") AS ranked WHERE _rank_in_period <= ?"
+        )
+        params.append(int(top_k))
+
+    return sql, params
+
+
+def read_database(path, time_col, entity_col, value_col, table=None, query=None,
+                  time_format=None, start_time=None, end_time=None, top_k=None):
+    """
+    SQLite/DuckDB 파일에서 (time, entity, value) long 형태 DataFrame을 읽음.
+    table / query 중 하나는 필수 (query는 SELECT 문 그대로, 서브쿼리로 감쌈).
+    """
+    kind = detect_db_kind(path)
+    if kind is None:
+        raise ValueError(f"지원하지 않는 DB 파일 확장자입니다: {path}")
+    if bool(table) == bool(query):
+        raise ValueError("DB 입력은 --table 또는 --query 중 하나만 지정해야 합니다.")
+
+    source_sql = _quote(table) if table else f"({query}) AS src"
+
+    con = _connect(path, kind)
+    try:
+        # 시간 컬럼 타입/형식을 확인할 수 있을 때만 기간 필터를 SQL로 내려보냄
+        # (내려보내지 않아도 prepare_dataframe의 pandas 필터가 그대로 적용됨)
+        start = end = None
+        end_exclusive = False
+        if start_time is not None or end_time is not None:
+            probe = _fetch_df(
+                con, kind,
+                f"SELECT {_quote(time_col)} FROM {source_sql} "
+                f"WHERE {_quote(time_col)} IS NOT NULL LIMIT 1", [],
+            )
+            sample = probe.iloc[0, 0] if len(probe) else None
+            iso_column = (
+                isinstance(sample, str) and not time_format
+                and _is_iso_column(con, kind, source_sql, time_col)
+            )
+            start, end, end_exclusive = _time_bounds(
+                sample, start_time, end_time, time_format, iso_column
+            )
+
+        sql, params = build_query(
+            source_sql, time_col, entity_col, value_col, start, end, top_k, end_exclusive
+        )
+        df = _fetch_df(con, kind, sql, params)
+    finally:
+        con.close()
+
+    print(f"DB 조회: {len(df):,} rows ({kind}: {path})")
+    return df
@@ -0,0 +1,309 @@
+# src/export.py
+"""
+한 번 렌더링한 프레임을 여러 출력(해상도/포맷)으로 동시에 인코딩하는 모듈.
+
+프레임은 가장 큰 해상도(메인 figure 크기)로 한 번만 그리고,
+각 출력마다 ffmpeg 프로세스를 하나씩 띄워서 스레드로 나눠 보냄.
+스케일/여백(pad)/GIF 팔레트 처리는 모두 ffmpeg 필터에서 처리.
+
+출력 지정 예:
+    outputs/race_720p.mp4@1280x720     # 16:9 → 720p 축소
+    outputs/race_square.mp4@1080x1080  # 정사각형: 전체가 들어가게 축소 + 위아래 배경색 여백
+    outputs/teaser.gif@640x360         # GIF 티저
+    outputs/race.mp4                   # 크기 생략 시 원본 해상도
+"""
+
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+from dataclasses import dataclass
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from matplotlib.animation import AbstractMovieWriter
+from matplotlib.colors import to_hex
+
+
+@dataclass
+class OutputTarget:
+    path: str
+    size: Optional[Tuple[int, int]] = None  # (가로, 세로), None이면 원본 그대로
+
+
+def parse_output_spec(spec: str) -> OutputTarget:
+    """'경로[@가로x세로]' 문자열을 OutputTarget으로 변환."""
+    path, sep, size = spec.rpartition("@")
+    if not sep:
+        return OutputTarget(spec)
+
+    try:
+        w, h = (int(v) for v in size.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"출력 크기 형식이 잘못됐습니다 (예: 1280x720): {spec}")
+
+    # yuv420p 인코딩은 가로/세로가 짝수여야 함
+    if w <= 0 or h <= 0 or w % 2 or h % 2:
+        raise ValueError(f"출력 크기는 양의 짝수여야 합니다: {spec}")
+
+    return OutputTarget(path, (w, h))
+
+
+def _sum_expr(terms):
+    """항 목록을 괄호로 균형 있게 묶은 합 (ffmpeg 표현식 평가 깊이를 log n으로 유지)."""
+    if len(terms) == 1:
+        return terms[0]
+    mid = len(terms) // 2
+    return f"({_sum_expr(terms[:mid])}+{_sum_expr(terms[mid:])})"
+
+
+def _hold_filters(repeats, fps, end_pause=0.0):
+    """
+    프레임마다 유지할 tick 수(repeats)를 ffmpeg 타임스탬프로 바꾸는 필터.
+
+    프레임은 한 번씩만 보내고, n번째 프레임의 시작 시각을
+    (n + 앞쪽 정지 프레임들의 추가 tick 합) / fps 로 다시 매김 (setpts).
+    VFR에서는 마지막 프레임의 길이가 정해지지 않으므로
+    마지막 프레임의 정지 tick과 end_pause는 tpad로 복제해서 붙임.
+    """
+    filters = []
+    repeats = [] if repeats is None else [int(r) for r in repeats]
+
+    held = [
+        f"{r - 1}*gt(N,{j})" for j, r in enumerate(repeats[:-1]) if r > 1
+    ]
+    if held:
+        # 표현식 안의 쉼표가 필터 구분자로 읽히지 않도록 작은따옴표로 감쌈
+        filters.append(f"setpts='(N+{_sum_expr(held)})/FRAME_RATE/TB'")
+
+    tail = (repeats[-1] - 1) / fps if repeats else 0.0
+    if tail + end_pause > 0:
+        filters.append(f"tpad=stop_mode=clone:stop_duration={tail + end_pause:.6f}")
+    return filters
+
+
+def _build_filter_graph(target: OutputTarget, frame_size, fps, repeats=None, vfr=False,
+                        end_pause=0.0, pad_color="black") -> str:
+    """출력 하나의 ffmpeg 필터 그래프 문자열 (필터가 없으면 빈 문자열)."""
+    w, h = frame_size
+
+    # 정지 구간: 프레임은 한 번만 받고 타임스탬프로 길이를 표현
+    filters = _hold_filters(repeats, fps, end_pause)
+    if filters and not vfr:
+        # cfr: 타임스탬프 사이를 ffmpeg가 같은 프레임 복제로 채워 고정 프레임레이트로
+        filters.append(f"fps={fps}")
+    if target.size is not None and tuple(target.size) != (w, h):
+        tw, th = target.size
+        # 비율이 다르면 (정사각형 컷 등) 라벨이 잘리지 않도록 전체가 들어가게 줄이고
+        # 남는 부분은 배경색으로 채움
+        filters.append(
+            f"scale={tw}:{th}:force_original_aspect_ratio=decrease:flags=lanczos"
+        )
+        filters.append(
+            f"pad={tw}:{th}:(ow-iw)/2:(oh-ih)/2:color=0x{to_hex(pad_color)[1:]}"
+        )
+
+    if target.path.lower().endswith(".gif"):
+        # GIF는 팔레트를 따로 뽑아야 색이 뭉개지지 않음
+        filters.append("split[a][b];[a]palettegen[p];[b][p]paletteuse")
+    return ",".join(filters)
+
+
+def _build_ffmpeg_cmd(target: OutputTarget, frame_size, fps, pix_fmt="rgba",
+                      filter_script=None, vfr=False):
+    """
+    filter_script: 필터 그래프를 담은 파일 경로.
+    정지 구간 타임스탬프 표현식은 정지 프레임 수에 비례해서 길어지므로
+    (1만 개면 150KB 정도) 명령행 인자 길이 제한에 걸리지 않게 파일로 넘김.
+    """
+    w, h = frame_size
+    cmd = [
+        "ffmpeg", "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-vcodec", "rawvideo",
+        "-s", f"{w}x{h}", "-pix_fmt", pix_fmt,
+        "-framerate", str(fps),
+        "-i", "pipe:",
+    ]
+    if filter_script is not None:
+        cmd += ["-filter_script:v", filter_script]
+    if not target.path.lower().endswith(".gif"):
+        cmd += ["-vcodec", "libx264", "-pix_fmt", "yuv420p"]
+
+    if vfr:
+        # 타임스탬프를 그대로 써서 정지 구간을 '긴 프레임 하나'로 저장
+        cmd += ["-fps_mode", "vfr"]
+
+    cmd.append(target.path)
+    return cmd
+
+
+class _EncoderThread:
+    """출력 하나 = ffmpeg 프로세스 하나 + 프레임을 밀어넣는 스레드 하나."""
+
+    def __init__(self, target: OutputTarget, frame_size, fps, pix_fmt="rgba",
+                 repeats=None, vfr=False, end_pause=0.0, pad_color="black", max_queue=8):
+        self.target = target
+        self.filter_script = None
+        graph = _build_filter_graph(
+            target, frame_size, fps, repeats, vfr, end_pause, pad_color
+        )
+        if graph:
+            fd, self.filter_script = tempfile.mkstemp(prefix="rank_race_", suffix=".ffgraph")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(graph)
+        self.cmd = _build_ffmpeg_cmd(
+            target, frame_size, fps, pix_fmt, self.filter_script, vfr
+        )
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.error = None
+
+        out_dir = os.path.dirname(target.path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+
+        try:
+            self.proc = subprocess.Popen(
+                self.cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+        except OSError:
+            self._remove_filter_script()
+            raise
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            frame = self.queue.get()
+            if frame is None:
+                break
+            if self.error is not None:
+                # 이미 실패한 인코더는 큐만 비워줌 (렌더링 쪽이 막히지 않게)
+                continue
+            try:
+                self.proc.stdin.write(frame)
+            except (BrokenPipeError, OSError) as e:
+                self.error = e
+
+    def _remove_filter_script(self):
+        if self.filter_script is not None and os.path.exists(self.filter_script):
+            os.remove(self.filter_script)
+
+    def put(self, frame: bytes):
+        self.queue.put(frame)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        try:
+            self.proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        stderr = self.proc.stderr.read().decode("utf-8", errors="replace")
+        self.proc.wait()
+        self._remove_filter_script()
+
+        if self.proc.returncode != 0 or self.error is not None:
+            raise RuntimeError(
+                f"ffmpeg 인코딩 실패: {self.target.path}\n"
+                f"명령어: {' '.join(self.cmd)}\n{stderr}"
+            )
+
+
+class FrameFanout:
+    """
+    프레임 바이트(기본 RGBA, raster 엔진은 RGB)를 받아서 모든 출력 인코더에 동시에 전달.
+    프레임 bytes 객체는 읽기 전용으로 공유되므로 출력 수만큼 복사하지 않음.
+
+    repeats[n]: n번째로 write한 프레임을 유지할 tick 수 (1 tick = 1/fps초).
+    정지 구간도 프레임은 한 번만 보내고 ffmpeg 타임스탬프로 길이를 늘림.
+    vfr=True면 그대로 '긴 프레임 하나'로 저장, False면 ffmpeg가 복제해서 고정 프레임레이트로.
+    end_pause(초)는 마지막 장면 정지 시간.
+    pad_color: 비율이 다른 출력에서 남는 부분을 채울 색 (보통 figure 배경색).
+    """
+
+    def __init__(self, targets: List[OutputTarget], frame_size, fps, pix_fmt="rgba",
+                 repeats=None, vfr=False, end_pause=0.0, pad_color="black"):
+        self.targets = targets
+        self.frame_size = frame_size
+        self.fps = fps
+        self.pix_fmt = pix_fmt
+        self.repeats = repeats
+        self.vfr = vfr
+        self.end_pause = end_pause
+        self.pad_color = pad_color
+        self._encoders = []
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        self._encoders = [
+            _EncoderThread(
+                t, self.frame_size, self.fps, self.pix_fmt,
+                self.repeats, self.vfr, self.end_pause, self.pad_color,
+            )
+            for t in self.targets
+        ]
+
+    def write(self, frame: bytes):
+        for enc in self._encoders:
+            enc.put(frame)
+
+    def close(self):
+        errors = []
+        for enc in self._encoders:
+            try:
+                enc.close()
+            except RuntimeError as e:
+                errors.append(str(e))
+        self._encoders = []
+
+        if errors:
+            raise RuntimeError("\n\n".join(errors))
+
+
+class MultiOutputWriter(AbstractMovieWriter):
+    """
+    matplotlib Animation.save()에 넘길 수 있는 writer.
+    figure를 프레임당 한 번만 래스터화하고, 결과를 FrameFanout으로 뿌림.
+
+    메인 출력(save에 넘긴 파일명)은 원본 해상도로,
+    extra_targets는 각자 지정한 크기로 스케일해서 저장 (비율이 다르면 figure 배경색 여백).
+    frame_repeats를 주면 n번째 grab_frame 결과를 frame_repeats[n] tick 동안 유지.
+    """
+
+    def __init__(self, fps, extra_targets=None, frame_repeats=None, vfr=False, end_pause=0.0):
+        super().__init__(fps=fps)
+        self.extra_targets = list(extra_targets or [])
+        self.frame_repeats = frame_repeats
+        self.vfr = vfr
+        self.end_pause = end_pause
+        self._fanout = None
+
+    def setup(self, fig, outfile, dpi=None):
+        super().setup(fig, outfile, dpi=dpi)
+        targets = [OutputTarget(str(outfile))] + self.extra_targets
+        self._fanout = FrameFanout(
+            targets, self.frame_size, self.fps, repeats=self.frame_repeats,
+            vfr=self.vfr, end_pause=self.end_pause, pad_color=fig.get_facecolor(),
+        )
+        self._fanout.start()
+
+    def grab_frame(self, **savefig_kwargs):
+        buf = BytesIO()
+        self.fig.savefig(buf, format="rgba", dpi=self.dpi, **savefig_kwargs)
+        self._fanout.write(buf.getvalue())
+
+    def finish(self):
+        self._fanout.close()
+
+
+# End of export.py
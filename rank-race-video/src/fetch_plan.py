@@ -0,0 +1,154 @@
+# src/fetch_plan.py
+"""
+시가총액 수집기의 호출 계획 (어떤 방식으로 pykrx를 부를지).
+
+두 가지 방식:
+  - snapshot: 월말마다 시장 전체 표(get_market_cap_by_ticker)를 1회씩
+      → 호출 수 ≈ 월 수 × 시장 수 (월말이 휴일이면 이전 영업일까지 재시도)
+  - ticker:   구간 안에서 anchor_months개월마다 찍은 월말 스냅샷(앵커)으로 후보 종목을 고르고,
+              후보 종목마다 구간 전체를 get_market_cap_by_date로 1회씩
+      → 호출 수 ≈ 앵커 수 × 시장 수 + 후보 종목 수
+
+상위 종목 구성이 안정적인 긴 기간은 ticker 방식이 훨씬 적게 부르고,
+짧은 기간이나 순위 변동(churn)이 큰 시기는 snapshot 방식이 싸다.
+auto는 전체 기간을 era_years 단위 구간(era)으로 나눠서 구간마다 더 싼 쪽을 고름.
+구간과 앵커는 달력 기준(연도 % era_years, 월 번호 % 앵커 간격)으로 정렬되므로
+--start/--end를 바꿔서 다시 돌려도 같은 앵커 스냅샷/기간 조회 캐시를 그대로 씀.
+
+앵커 간격은 churn(1년에 top_n에 새로 들어오는 종목 수)에서 정함:
+간격 동안 새로 들어오는 종목이 1개 정도가 되도록 12 / churn개월 (1~12개월).
+연속 anchor_months개월 이상 top_n에 머문 종목은 반드시 어떤 앵커에서 후보가 되지만,
+그보다 짧게만 들어왔다 빠진 종목은 앵커에서 후보(top_n × (1 + CANDIDATE_MARGIN))에
+못 들었다면 놓칠 수 있음 (근사). 그래서 기본값은 정확한 snapshot이고 ticker/auto는 선택.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# 월말이 주말/휴일이면 이전 영업일까지 다시 부르므로, 스냅샷 1건당 평균 호출 배수
+SNAPSHOT_RETRY_FACTOR = 1.4
+
+# 앵커 시점에서 top_n의 몇 배를 더 후보로 잡을지 (1.0 → 2 * top_n)
+CANDIDATE_MARGIN = 1.0
+
+STRATEGIES = ("snapshot", "ticker", "auto")
+
+
+@dataclass
+class EraPlan:
+    """구간 하나의 수집 계획."""
+    dates: pd.DatetimeIndex    # 구간 안의 월말 날짜 (요청 기간으로 잘린 것)
+    first_year: int            # 달력 기준 구간의 첫 해
+    anchors: pd.DatetimeIndex  # ticker 방식에서 후보를 고를 월말 날짜
+    strategy: str              # "snapshot" / "ticker"
+    snapshot_calls: float    # snapshot 방식 예상 호출 수
+    ticker_calls: float      # ticker 방식 예상 호출 수
+
+    @property
+    def estimated_calls(self) -> float:
+        return self.snapshot_calls if self.strategy == "snapshot" else self.ticker_calls
+
+
+def candidate_count(top_n: int) -> int:
+    """앵커 스냅샷에서 후보로 뽑을 종목 수."""
+    return int(np.ceil(top_n * (1 + CANDIDATE_MARGIN)))
+
+
+def anchor_months(churn: float) -> int:
+    """앵커 스냅샷 간격(개월): 간격마다 새로 들어오는 종목이 1개 정도가 되도록."""
+    if churn <= 0:
+        return 12
+    return int(np.clip(np.floor(12 / churn), 1, 12))
+
+
+def anchor_dates(dates: pd.DatetimeIndex, months: int) -> pd.DatetimeIndex:
+    """달력 기준 months개월마다의 월말 (구간 안에 하나도 없으면 첫 월말)."""
+    aligned = dates[(dates.year * 12 + dates.month - 1) % months == 0]
+    return aligned if len(aligned) else dates[:1]
+
+
+def estimate_snapshot_calls(n_dates: int, n_markets: int, cached: int = 0) -> float:
+    """snapshot 방식 예상 호출 수 (cached: 이미 저장소에 있는 (날짜, 시장) 수)."""
+    return max(n_dates * n_markets - cached, 0) * SNAPSHOT_RETRY_FACTOR
+
+
+def estimate_ticker_calls(years: float, n_markets: int, top_n: int, churn: float,
+                          n_anchors: int, cached_anchors: int = 0) -> float:
+    """
+    ticker 방식 예상 호출 수.
+    churn: 1년에 top_n에 새로 들어오는 종목 수 (시장별 기대값)
+    """
+    anchors = max(n_anchors * n_markets - cached_anchors, 0) * SNAPSHOT_RETRY_FACTOR
+    universe = n_markets * (candidate_count(top_n) + churn * years)
+    return anchors + universe
+
+
+def era_start(year: int, era_years: int) -> int:
+    """year가 속한 구간의 첫 해 (달력 기준, 예: era_years=5면 2010, 2015, ...)."""
+    era_years = max(int(era_years), 1)
+    return year // era_years * era_years
+
+
+def split_eras(dates: pd.DatetimeIndex, era_years: int):
+    """월말 날짜들을 달력 기준 era_years년 단위 구간으로 나눔 (--start와 무관하게 같은 경계)."""
+    if len(dates) == 0:
+        return []
+    era_no = era_start(dates.year, era_years)
+    return [dates[era_no == k] for k in np.unique(era_no)]
+
+
+def plan_fetch(dates, n_markets, top_n, churn, era_years=5, strategy="snapshot",
+               is_cached=None):
+    """
+    구간별 수집 방식을 정함.
+
+    is_cached(date_str) → 그 월말 스냅샷이 모든 시장에 대해 저장돼 있는지.
+    저장소에 있는 스냅샷은 호출 비용 0으로 계산하므로,
+    예전에 snapshot으로 받아둔 구간은 다시 돌려도 snapshot이 선택됨.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"알 수 없는 수집 방식입니다: {strategy}")
+
+    spacing = anchor_months(churn)
+
+    plans = []
+    for era in split_eras(dates, era_years):
+        anchors = anchor_dates(era, spacing)
+        cached = 0
+        cached_anchors = 0
+        if is_cached is not None:
+            hits = {dt: is_cached(dt.strftime("%Y%m%d")) for dt in era}
+            cached = sum(hits.values()) * n_markets
+            cached_anchors = sum(hits[dt] for dt in anchors) * n_markets
+
+        years = len(era) / 12
+        snapshot_calls = estimate_snapshot_calls(len(era), n_markets, cached)
+        ticker_calls = estimate_ticker_calls(
+            years, n_markets, top_n, churn, len(anchors), cached_anchors
+        )
+
+        if strategy == "auto":
+            chosen = "ticker" if ticker_calls < snapshot_calls else "snapshot"
+        else:
+            chosen = strategy
+
+        plans.append(EraPlan(
+            era, era_start(era[0].year, era_years), anchors,
+            chosen, snapshot_calls, ticker_calls,
+        ))
+
+    return plans
+
+
+def print_plan(plans):
+    print("🧭 수집 계획 (구간별 예상 호출 수: snapshot / ticker)")
+    for p in plans:
+        first, last = p.dates[0].strftime("%Y-%m"), p.dates[-1].strftime("%Y-%m")
+        print(
+            f"   {first} ~ {last}: {p.snapshot_calls:6.0f} / {p.ticker_calls:6.0f}"
+            f" → {p.strategy}"
+        )
+    total = sum(p.estimated_calls for p in plans)
+    print(f"   예상 총 호출 수: 약 {total:,.0f}회")
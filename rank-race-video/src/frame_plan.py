@@ -0,0 +1,213 @@
+# src/frame_plan.py
+"""
+기간 사이 보간 프레임 수를 정하고, 프레임 단위 values/ranks를 만드는 모듈.
+
+bar_chart_race의 prepare_wide_data는 모든 기간 사이에 steps_per_period개를
+똑같이 넣지만, 여기서는 기간 쌍마다 step 수를 따로 줄 수 있음.
+(adaptive 모드: 순위/값 변화가 큰 구간에 프레임을 몰아주고, 조용한 구간은 최소화)
+"""
+
+import numpy as np
+import pandas as pd
+
+# 값 변화율 100%를 순위 몇 칸 이동과 같게 볼지 (변화 점수 가중치)
+VALUE_CHANGE_WEIGHT = 2.0
+
+# 예산을 따로 안 줬을 때, 조용한 구간에서 아낀 프레임 중 변화가 큰 구간에 다시 줄 비율
+SPARE_SHARE = 0.5
+
+
+def _desc_ranks(values: np.ndarray, top_n: int) -> np.ndarray:
+    """행(시점)별 내림차순 순위 (1 = 1등), top_n 밖은 top_n + 1로 clip."""
+    order = np.argsort(-values, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    rows = np.arange(values.shape[0])[:, None]
+    ranks[rows, order] = np.arange(1, values.shape[1] + 1)
+    return np.minimum(ranks, top_n + 1)
+
+
+def compute_change_scores(pivot: pd.DataFrame, top_n: int):
+    """
+    연속된 두 기간 사이의 변화량 점수.
+
+    반환:
+      - scores: (기간 수 - 1,) 배열. 순위 이동 칸 수 + 값 변화율 * VALUE_CHANGE_WEIGHT
+      - rank_moves: 순위 이동 칸 수만 따로 (0이면 순위 변동 없는 구간)
+    """
+    values = np.nan_to_num(pivot.to_numpy(dtype=float))
+    if len(values) < 2:
+        return np.zeros(0), np.zeros(0)
+
+    ranks = _desc_ranks(values, top_n)
+    rank_moves = np.abs(np.diff(ranks, axis=0)).sum(axis=1).astype(float)
+
+    # 화면에 보이는(두 시점 중 한 번이라도 top_n 안) 막대의 상대 길이 변화
+    visible = (ranks[:-1] <= top_n) | (ranks[1:] <= top_n)
+    delta = np.abs(np.diff(values, axis=0)) * visible
+    scale = (np.maximum(values[:-1], values[1:]) * visible).sum(axis=1)
+    value_moves = np.divide(
+        delta.sum(axis=1), scale, out=np.zeros(len(delta)), where=scale > 0
+    )
+
+    return rank_moves + VALUE_CHANGE_WEIGHT * value_moves, rank_moves
+
+
+def allocate_steps(scores, budget, min_steps=1, max_steps=None) -> np.ndarray:
+    """
+    총 프레임 예산(budget)을 구간별 점수에 비례해서 나눔.
+    각 구간은 최소 min_steps, 최대 max_steps 프레임 (둘 다 구간별 배열도 가능).
+    """
+    scores = np.asarray(scores, dtype=float)
+    n_gaps = len(scores)
+    if n_gaps == 0:
+        return np.zeros(0, dtype=int)
+
+    min_steps = np.broadcast_to(np.asarray(min_steps, dtype=float), n_gaps)
+    max_steps = np.maximum(budget if max_steps is None else max_steps, min_steps)
+    budget = int(np.clip(budget, min_steps.sum(), max_steps.sum()))
+    steps = min_steps.copy()
+    remaining = budget - steps.sum()
+
+    weights = scores if scores.sum() > 0 else np.ones(n_gaps)
+
+    # 상한에 걸린 구간 몫은 나머지 구간에 다시 나눠줌 (water-filling)
+    while remaining > 1e-9:
+        open_ = steps < max_steps
+        w = weights * open_
+        if w.sum() <= 0:
+            w = open_.astype(float)
+            if w.sum() <= 0:
+                break
+        add = np.minimum(remaining * w / w.sum(), max_steps - steps)
+        steps += add
+        remaining -= add.sum()
+        if add.sum() <= 1e-9:
+            break
+
+    # 정수화: 내림 후 소수점이 큰 구간부터 1씩 채워서 합계를 예산에 맞춤
+    result = np.floor(steps + 1e-9).astype(int)
+    short = budget - result.sum()
+    if short > 0:
+        order = np.argsort(-(steps - result), kind="stable")
+        result[order[:short]] += 1
+
+    return result
+
+
+def plan_adaptive_steps(pivot, top_n, steps_per_period, budget=None,
+                        min_steps=1, max_steps=None, min_active_steps=None):
+    """
+    adaptive 모드의 구간별 step 수.
+
+    순위가 바뀌는 구간(추월)은 최소 min_active_steps(기본 steps_per_period)를 보장해서
+    고정 방식보다 끊겨 보이지 않게 하고, 순위가 그대로인 구간은 최소 min_steps.
+    남는 예산은 그 위에 점수 비례로 재분배.
+    budget이 없으면 두 최소값의 합 + 조용한 구간에서 아낀 프레임의 SPARE_SHARE만큼을 예산으로 잡음.
+    """
+    scores, rank_moves = compute_change_scores(pivot, top_n)
+    if max_steps is None:
+        max_steps = steps_per_period * 2
+    if min_active_steps is None:
+        min_active_steps = steps_per_period
+    min_active_steps = min(max(min_active_steps, min_steps), max_steps)
+
+    active = rank_moves > 0
+    n_active = int(active.sum())
+    n_quiet = len(scores) - n_active
+    if budget is None:
+        saved = n_quiet * max(steps_per_period - min_steps, 0)
+        budget = n_active * min_active_steps + n_quiet * min_steps + int(saved * SPARE_SHARE)
+    elif n_active and budget < n_active * min_active_steps + n_quiet * min_steps:
+        # 예산이 모자라면 추월 구간 최소값을 예산 안으로 낮춤 (그래도 min_steps 이상)
+        fit = max((budget - n_quiet * min_steps) // n_active, min_steps)
+        print(
+            f"[경고] 프레임 예산({budget:,})이 추월 구간 {n_active:,}개에 "
+            f"{min_active_steps}프레임씩 주기에 모자라서 {fit}프레임씩으로 줄입니다."
+        )
+        min_active_steps = fit
+
+    floors = np.where(active, min_active_steps, min_steps)
+    return allocate_steps(scores, budget, min_steps=floors, max_steps=max_steps)
+
+
+def prepare_frames(df, steps, orientation="h", sort="desc", n_bars=None,
+                   interpolate_period=False):
+    """
+    bcr.prepare_wide_data와 같은 결과 형식((df_values, df_ranks))을 만들되,
+    기간 쌍마다 steps[i]개의 step을 사용.
+    """
+    if n_bars is None:
+        n_bars = df.shape[1]
+
+    steps = np.asarray(steps, dtype=int)
+    if len(steps) != max(len(df) - 1, 0):
+        raise ValueError("steps 길이는 (기간 수 - 1)과 같아야 합니다.")
+
+    # 각 기간(anchor)이 놓일 프레임 위치
+    anchor_pos = np.concatenate([[0], np.cumsum(steps)])
+
+    df_values = df.reset_index()
+    df_values.index = anchor_pos
+    df_values = df_values.reindex(range(anchor_pos[-1] + 1))
+
+    time_col = df_values.columns[0]
+    if interpolate_period:
+        anchors = df.index
+        if anchors.dtype.kind == "M":
+            t = np.interp(
+                df_values.index, anchor_pos, anchors.asi8.astype(float)
+            )
+            df_values[time_col] = pd.to_datetime(t.astype("int64"))
+        else:
+            df_values[time_col] = np.interp(
+                df_values.index, anchor_pos, anchors.to_numpy(dtype=float)
+            )
+    else:
+        df_values[time_col] = df_values[time_col].ffill()
+
+    df_values = df_values.set_index(time_col)
+
+    df_ranks = df_values.rank(axis=1, method="first", ascending=False).clip(upper=n_bars + 1)
+    if (sort == "desc" and orientation == "h") or (sort == "asc" and orientation == "v"):
+        df_ranks = n_bars + 1 - df_ranks
+    df_ranks = df_ranks.interpolate()
+
+    df_values = df_values.interpolate()
+    return df_values, df_ranks
+
+
+def format_period_labels(index, period_fmt):
+    """bcr의 기간 라벨 규칙과 동일 (datetime이면 strftime, 아니면 문자열)."""
+    if period_fmt:
+        if index.dtype.kind == "M":
+            return [t.strftime(period_fmt) for t in index]
+        return [period_fmt.format(x=v) for v in index]
+    return list(index.astype(str))
+
+
+def find_frame_holds(df_values, df_ranks, period_labels):
+    """
+    직전 프레임과 데이터가 완전히 같은 프레임(값/순위/기간 라벨 동일)을 찾아서 묶음.
+
+    반환:
+      - frame_indices: 실제로 그릴 프레임 번호
+      - repeats: 각 프레임이 유지될 tick 수 (1 = 한 프레임, 2 이상 = 정지 구간)
+    """
+    values = df_values.to_numpy(dtype=float)
+    ranks = df_ranks.to_numpy(dtype=float)
+    labels = np.asarray(period_labels, dtype=object)
+    n = len(values)
+    if n == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    def same_as_prev(arr):
+        cur, prev = arr[1:], arr[:-1]
+        return ((cur == prev) | (np.isnan(cur) & np.isnan(prev))).all(axis=1)
+
+    same = np.zeros(n, dtype=bool)
+    if n > 1:
+        same[1:] = same_as_prev(values) & same_as_prev(ranks) & (labels[1:] == labels[:-1])
+
+    frame_indices = np.flatnonzero(~same)
+    repeats = np.diff(np.append(frame_indices, n))
+    return frame_indices, repeats
@@ -0,0 +1,254 @@
+# src/market_snapshot_store.py
+"""
+pykrx 원본 응답(시장 전체 시가총액 표)을 날짜별로 저장해두는 로컬 스냅샷 저장소.
+
+collect_korea_market_cap_monthly가 top_n / 시장 / 컬럼 설정을 바꿔서 다시 돌려도
+저장된 스냅샷만으로 답할 수 있도록, 잘라내기 전의 전체 표를 그대로 보관함.
+
+디렉터리 구조:
+    data/snapshots/
+      KOSPI/2024/20240131.csv.gz    # get_market_cap_by_ticker 원본 (티커 포함 전체 컬럼)
+      KOSPI/2024/20240131.json      # 수집 메타데이터 (수집 시각, 행 수, 컬럼, pykrx 버전 ...)
+      KOSPI/ranges/005930_20091201_20141231.csv.gz  # get_market_cap_by_date 원본 (종목별 기간 조회)
+      ticker_names.json             # 티커 → 종목명 캐시 (종목명 컬럼이 없던 날짜 보강용)
+
+저장 규칙:
+  - 최근 RECENT_DAYS일 안의 날짜(기간 조회는 끝 날짜)는 저장하지 않음
+    (KRX 발표 전/장중에 받은 값이나 일시적 실패로 빈 응답이 영구히 남지 않도록)
+  - 빈 응답/전부 0인 응답(비거래일 등)은 저장. 날짜 뒤 EMPTY_SETTLE_DAYS일 안에 받은
+    빈 응답만 일시적 실패일 수 있다고 보고 EMPTY_TTL_DAYS일이 지나면 다시 받음
+    (그보다 한참 뒤에 받은 빈 응답은 진짜 비거래일로 보고 계속 사용,
+     offline 실행에서는 기한이 지난 빈 응답도 그대로 사용)
+  - refresh=True면 저장된 것을 무시하고 이번 실행에서 새로 받은 것만 사용
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+TICKER_COL = "티커"
+DATE_COL = "날짜"
+
+# 이 기간 안의 날짜는 아직 확정되지 않은 값일 수 있어서 저장하지 않음
+RECENT_DAYS = 7
+
+# 날짜 뒤 EMPTY_SETTLE_DAYS일 안에 받은 빈 응답은 일시적 실패일 수도 있으므로
+# EMPTY_TTL_DAYS일이 지나면 다시 받음 (그 뒤에 받은 빈 응답은 비거래일로 확정)
+EMPTY_SETTLE_DAYS = 30
+EMPTY_TTL_DAYS = 30
+
+
+def _pykrx_version():
+    try:
+        from importlib.metadata import version
+        return version("pykrx")
+    except Exception:
+        return None
+
+
+def _is_blank(raw):
+    """빈 표이거나 숫자 컬럼이 전부 0인 표 (비거래일/실패 응답)."""
+    if raw is None or raw.empty:
+        return True
+    numbers = raw.select_dtypes("number")
+    return numbers.shape[1] > 0 and not numbers.to_numpy().any()
+
+
+def _now():
+    return datetime.now()
+
+
+def _is_recent(date_str):
+    return datetime.strptime(date_str, "%Y%m%d") >= _now() - timedelta(days=RECENT_DAYS)
+
+
+class SnapshotStore:
+    def __init__(self, root="data/snapshots", refresh=False):
+        self.root = root
+        self.refresh = refresh
+        self._names = None
+        self._fresh = set()  # 이번 실행에서 저장한 항목 (refresh여도 다시 받지 않음)
+        self._ranges = {}  # 시장 → {티커: [(from, to), ...]} 저장된 기간 조회 목록
+
+    # ── 경로 ──
+
+    def _base(self, market: str, date_str: str):
+        return os.path.join(self.root, market.upper(), date_str[:4], date_str)
+
+    def data_path(self, market: str, date_str: str):
+        return self._base(market, date_str) + ".csv.gz"
+
+    def meta_path(self, market: str, date_str: str):
+        return self._base(market, date_str) + ".json"
+
+    def range_base(self, market: str, ticker: str, from_str: str, to_str: str):
+        return os.path.join(self.root, market.upper(), "ranges", f"{ticker}_{from_str}_{to_str}")
+
+    # ── 공통 읽기/쓰기 ──
+
+    def _has(self, base: str, date_str: str, allow_stale=False) -> bool:
+        if base in self._fresh:
+            return True
+        if self.refresh or not os.path.exists(base + ".json"):
+            return False
+
+        meta = self._read_meta(base)
+        if meta.get("empty") and not allow_stale:
+            fetched = datetime.fromisoformat(meta["fetched_at"])
+            settled = fetched - datetime.strptime(date_str, "%Y%m%d")
+            if settled < timedelta(days=EMPTY_SETTLE_DAYS):
+                return _now() - fetched < timedelta(days=EMPTY_TTL_DAYS)
+        return True
+
+    def _read(self, base: str, index_col: str) -> pd.DataFrame:
+        meta = self._read_meta(base)
+        if meta.get("empty"):
+            return pd.DataFrame(columns=meta.get("columns", [])).rename_axis(index_col)
+
+        df = pd.read_csv(
+            base + ".csv.gz",
+            dtype={TICKER_COL: str},  # 티커 앞자리 0 유지
+            parse_dates=[DATE_COL] if index_col == DATE_COL else False,
+            compression="gzip",
+        )
+        return df.set_index(index_col)
+
+    def _read_meta(self, base: str) -> dict:
+        with open(base + ".json", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, base: str, raw: pd.DataFrame, index_col: str, meta: dict,
+               date_str: str) -> bool:
+        """저장 규칙(모듈 설명 참고)에 맞으면 저장하고 True."""
+        if _is_recent(date_str):
+            return False
+
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+
+        empty = _is_blank(raw)
+        if os.path.exists(base + ".json"):
+            os.remove(base + ".json")  # 덮어쓰는 동안 예전 메타로 읽히지 않도록
+        if not empty:
+            raw.rename_axis(index_col).reset_index().to_csv(
+                base + ".csv.gz",
+                index=False,
+                encoding="utf-8",
+                compression="gzip",
+            )
+
+        meta = {
+            **meta,
+            "fetched_at": _now().isoformat(timespec="seconds"),
+            "rows": 0 if empty else int(len(raw)),
+            "columns": [] if raw is None else [str(c) for c in raw.columns],
+            "empty": bool(empty),
+            "pykrx_version": _pykrx_version(),
+        }
+        # 메타 파일이 '저장 완료' 표시 역할을 하므로 데이터 다음에 씀
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+
+        self._fresh.add(base)
+        return True
+
+    # ── 날짜별 시장 전체 스냅샷 ──
+
+    def has(self, market: str, date_str: str, allow_stale=False) -> bool:
+        """저장된 스냅샷을 쓸 수 있는지 (allow_stale: 기한 지난 빈 응답도 인정)."""
+        return self._has(self._base(market, date_str), date_str, allow_stale)
+
+    def load(self, market: str, date_str: str) -> pd.DataFrame:
+        """저장된 원본 표를 pykrx 응답과 같은 모양(index=티커)으로 반환."""
+        return self._read(self._base(market, date_str), TICKER_COL)
+
+    def load_meta(self, market: str, date_str: str) -> dict:
+        return self._read_meta(self._base(market, date_str))
+
+    def save(self, market: str, date_str: str, raw: pd.DataFrame, source: str) -> bool:
+        """pykrx 원본 응답(index=티커)을 압축 CSV + 메타 JSON으로 저장 (저장했으면 True)."""
+        return self._write(
+            self._base(market, date_str), raw, TICKER_COL,
+            {"date": date_str, "market": market.upper(), "source": source},
+            date_str,
+        )
+
+    # ── 종목별 기간 조회 ──
+
+    def has_range(self, market: str, ticker: str, from_str: str, to_str: str,
+                  allow_stale=False) -> bool:
+        return self._has(self.range_base(market, ticker, from_str, to_str), to_str, allow_stale)
+
+    def _range_index(self, market: str) -> dict:
+        market = market.upper()
+        if market not in self._ranges:
+            index = {}
+            range_dir = os.path.join(self.root, market, "ranges")
+            if os.path.isdir(range_dir):
+                for name in os.listdir(range_dir):
+                    if name.endswith(".json"):
+                        ticker, from_str, to_str = name[:-len(".json")].rsplit("_", 2)
+                        index.setdefault(ticker, []).append((from_str, to_str))
+            self._ranges[market] = index
+        return self._ranges[market]
+
+    def find_range(self, market: str, ticker: str, from_str: str, to_str: str,
+                   allow_stale=False):
+        """
+        [from_str, to_str]를 모두 포함하는 저장된 기간 조회의 (from, to), 없으면 None.
+        기간을 다르게 잡아 다시 돌려도 더 넓게 받아둔 결과를 잘라서 쓸 수 있게.
+        """
+        covering = [
+            (f, t) for f, t in self._range_index(market).get(ticker, [])
+            if f <= from_str and t >= to_str
+        ]
+        # 가장 좁은 것부터 (읽을 양이 적은 순)
+        span = lambda ft: datetime.strptime(ft[1], "%Y%m%d") - datetime.strptime(ft[0], "%Y%m%d")
+        for f, t in sorted(covering, key=span):
+            if self.has_range(market, ticker, f, t, allow_stale):
+                return f, t
+        return None
+
+    def load_range(self, market: str, ticker: str, from_str: str, to_str: str) -> pd.DataFrame:
+        """저장된 기간 조회 결과를 pykrx 응답과 같은 모양(index=날짜)으로 반환."""
+        return self._read(self.range_base(market, ticker, from_str, to_str), DATE_COL)
+
+    def save_range(self, market: str, ticker: str, from_str: str, to_str: str,
+                   raw: pd.DataFrame, source: str) -> bool:
+        saved = self._write(
+            self.range_base(market, ticker, from_str, to_str), raw, DATE_COL,
+            {
+                "ticker": ticker,
+                "from": from_str,
+                "to": to_str,
+                "market": market.upper(),
+                "source": source,
+            },
+            to_str,
+        )
+        if saved:
+            entries = self._range_index(market).setdefault(ticker, [])
+            if (from_str, to_str) not in entries:
+                entries.append((from_str, to_str))
+        return saved
+
+    # ── 종목명 캐시 ──
+
+    def _names_path(self):
+        return os.path.join(self.root, "ticker_names.json")
+
+    def ticker_names(self) -> dict:
+        if self._names is None:
+            try:
+                with open(self._names_path(), encoding="utf-8") as f:
+                    self._names = json.load(f)
+            except FileNotFoundError:
+                self._names = {}
+        return self._names
+
+    def save_ticker_names(self, names: dict):
+        self.ticker_names().update(names)
+        os.makedirs(self.root, exist_ok=True)
+        with open(self._names_path(), "w", encoding="utf-8") as f:
+            json.dump(self._names, f, ensure_ascii=False, indent=2, sort_keys=True)
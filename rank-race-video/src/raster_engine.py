@@ -0,0 +1,387 @@
+# src/raster_engine.py
+"""
+matplotlib 없이 NumPy/Pillow로 프레임을 직접 합성하는 렌더링 엔진 (--engine raster).
+
+matplotlib은 프레임마다 artist 트리를 다시 그리고 한글 텍스트 레이아웃을 반복해서 느림.
+여기서는
+  1) 종목명/숫자(0-9, 쉼표)/기간 문자열을 처음에 한 번만 래스터화해서 sprite로 만들어두고
+  2) 제목/그리드/축선이 그려진 배경을 한 번 만든 뒤
+  3) 프레임마다 지난 프레임에서 그린 영역만 배경으로 되돌림 → 막대 사각형 채우기 → sprite 블릿
+만 해서 미리 잡아둔 RGB 버퍼에 프레임을 만듦.
+숫자 라벨은 캐시해둔 글리프를 라벨 하나로 합친 뒤 블렌딩 표(_blend_lut)로 한 번에 블렌딩.
+
+레이아웃/색상은 chart.py(matplotlib 엔진)와 같은 styles._STYLE_CONFIGS 값을 사용.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import matplotlib
+import numpy as np
+from matplotlib import colors as mcolors
+from matplotlib import font_manager, ticker
+from PIL import Image, ImageDraw, ImageFont
+
+from export import FrameFanout
+
+FIG_SIZE = (16, 9)
+DPI = 160
+
+
+_CHANNELS = np.arange(3, dtype=np.int32)
+
+
+@dataclass
+class Sprite:
+    """
+    알파 마스크를 블렌딩 표(_blend_lut) 위치로 바꿔둔 것 + anchor 기준 좌상단 offset.
+    index[y, 3 * x + c] = 알파 * 768 + c  (블릿할 때 배경값 * 3만 더해서 표에서 읽음)
+    """
+    index: np.ndarray  # (h, w * 3) int32
+    dx: int
+    dy: int
+
+    @classmethod
+    def from_mask(cls, mask, dx, dy):
+        """(h, w) uint8 알파 마스크에서 만듦."""
+        h, w = mask.shape
+        index = np.multiply(mask[:, :, None], 256 * 3, dtype=np.int32) + _CHANNELS
+        return cls(index.reshape(h, w * 3), dx, dy)
+
+    @property
+    def shape(self):
+        h, w3 = self.index.shape
+        return h, w3 // 3
+
+
+@lru_cache(maxsize=None)
+def _blend_lut(color):
+    """
+    color로 칠할 때의 블렌딩 결과 표: [알파][배경값][채널] → round((배경 * (255 - a) + color * a) / 255)
+    블릿은 (알파, 배경값, 채널) 위치를 찾아 읽기만 하면 됨.
+    """
+    a = np.arange(256)[:, None, None]
+    bg = np.arange(256)[None, :, None]
+    return np.rint((bg * (255 - a) + np.asarray(color) * a) / 255).astype(np.uint8).ravel()
+
+
+def _pt_to_px(size_pt):
+    return max(1, int(round(size_pt * DPI / 72)))
+
+
+def _rgb(color):
+    return np.array([int(round(c * 255)) for c in mcolors.to_rgb(color)], dtype=np.uint8)
+
+
+def _blend(fg, bg, alpha):
+    """불투명 배경 위에 alpha로 칠한 결과색 (막대는 미리 섞어서 단색으로 채움)."""
+    fg = np.asarray(mcolors.to_rgb(fg))
+    bg = np.asarray(mcolors.to_rgb(bg))
+    return np.round((fg * alpha + bg * (1 - alpha)) * 255).astype(np.uint8)
+
+
+def _font(weight, size_px):
+    prop = font_manager.FontProperties(
+        family=matplotlib.rcParams["font.family"], weight=weight
+    )
+    return ImageFont.truetype(font_manager.findfont(prop), size_px)
+
+
+def _render_sprite(font, text, anchor):
+    left, top, right, bottom = font.getbbox(text, anchor=anchor)
+    w, h = max(right - left, 1), max(bottom - top, 1)
+    img = Image.new("L", (w, h), 0)
+    ImageDraw.Draw(img).text((-left, -top), text, font=font, fill=255, anchor=anchor)
+    return Sprite.from_mask(np.asarray(img, dtype=np.uint8), left, top)
+
+
+class _GlyphStrip:
+    """
+    숫자 라벨용 글리프(0-9, 쉼표 등)를 같은 높이로 맞춰 캐시해두고,
+    문자열 하나를 Sprite 하나로 합성 (글자마다 블렌딩하지 않고 라벨당 한 번만 블렌딩).
+    """
+
+    def __init__(self, font, chars, anchor="lm"):
+        sprites = {ch: _render_sprite(font, ch, anchor) for ch in chars}
+        top = min(s.dy for s in sprites.values())
+        bottom = max(s.dy + s.shape[0] for s in sprites.values())
+        self.dy = top
+        self.height = bottom - top
+        self._blank = self._transparent(1)
+
+        self.glyphs = {}
+        for ch, s in sprites.items():
+            h, w = s.shape
+            index = self._transparent(w)
+            index[s.dy - top:s.dy - top + h] = s.index
+            self.glyphs[ch] = (index, s.dx, font.getlength(ch))
+
+    def _transparent(self, width):
+        """알파 0으로 채운 (height, width * 3) index."""
+        return np.tile(_CHANNELS, (self.height, width))
+
+    def compose(self, text, x=0.0):
+        """
+        text를 anchor 기준 Sprite 하나로 (알 수 없는 문자는 건너뜀, 없으면 None).
+        x: 그릴 위치 (소수점 아래에 따라 글자마다 반올림되는 픽셀 위치가 달라지므로).
+        """
+        placed = []
+        base = int(round(x))
+        pen = x
+        for ch in text:
+            glyph = self.glyphs.get(ch)
+            if glyph is not None:
+                index, dx, advance = glyph
+                placed.append((index, 3 * (int(round(pen)) - base + dx)))
+                pen += advance
+        if not placed:
+            return None
+
+        # 알파 * 768 + 채널의 최댓값 = 알파 최댓값 (겹치는 글자 가장자리)
+        left = min(off for _, off in placed)
+        right = max(off + index.shape[1] for index, off in placed)
+        if self._blank.shape[1] < right - left:
+            self._blank = self._transparent((right - left) // 3 * 2)
+        out = self._blank[:, :right - left].copy()
+        for index, off in placed:
+            region = out[:, off - left:off - left + index.shape[1]]
+            np.maximum(region, index, out=region)
+        return Sprite(out, left // 3, self.dy)
+
+
+def _bar_colors(cmap, n):
+    """bar_chart_race와 같은 규칙으로 컬럼 순서대로 색 배정."""
+    from bar_chart_race._colormaps import colormaps as bcr_colormaps
+
+    if cmap.lower() in bcr_colormaps:
+        palette = bcr_colormaps[cmap.lower()]
+    else:
+        cm = matplotlib.colormaps[cmap]
+        palette = [mcolors.to_hex(c) for c in cm(range(cm.N))]
+    return [palette[i % len(palette)] for i in range(n)]
+
+
+def _subplot_rect(style_cfg):
+    sub = style_cfg.get("subplot", {})
+    return (
+        style_cfg.get("subplot_left", sub.get("left", 0.22)),
+        style_cfg.get("subplot_right", sub.get("right", 0.97)),
+        style_cfg.get("subplot_top", sub.get("top", 0.80)),
+        style_cfg.get("subplot_bottom", sub.get("bottom", 0.12)),
+    )
+
+
+class _Canvas:
+    """
+    RGB 버퍼 위에 사각형 채우기 / sprite 블릿 (clip 영역 지원).
+    그린 영역을 기록해두고, 다음 프레임에서는 그 영역만 배경으로 되돌림.
+    """
+
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        self.buf = np.empty((height, width, 3), dtype=np.uint8)
+        self.dirty = None  # 배경 위에 그린 영역 목록 (None이면 전체)
+
+    def restore(self, background):
+        """배경 위에 그렸던 영역만 배경으로 되돌림 (처음에는 전체 복사)."""
+        if self.dirty is None:
+            np.copyto(self.buf, background)
+        else:
+            for y0, y1, x0, x1 in self.dirty:
+                self.buf[y0:y1, x0:x1] = background[y0:y1, x0:x1]
+        self.dirty = []
+
+    def _touch(self, y0, y1, x0, x1):
+        if self.dirty is not None:
+            self.dirty.append((y0, y1, x0, x1))
+
+    def fill_rect(self, x0, y0, x1, y1, color, clip=None):
+        cx0, cy0, cx1, cy1 = clip or (0, 0, self.width, self.height)
+        x0, x1 = max(int(round(x0)), cx0), min(int(round(x1)), cx1)
+        y0, y1 = max(int(round(y0)), cy0), min(int(round(y1)), cy1)
+        if x1 > x0 and y1 > y0:
+            self.buf[y0:y1, x0:x1] = color
+            self._touch(y0, y1, x0, x1)
+
+    def blend_rect(self, x0, y0, x1, y1, color, alpha):
+        x0, x1 = max(int(round(x0)), 0), min(int(round(x1)), self.width)
+        y0, y1 = max(int(round(y0)), 0), min(int(round(y1)), self.height)
+        if x1 > x0 and y1 > y0:
+            region = self.buf[y0:y1, x0:x1].astype(np.float32)
+            region += (np.asarray(color, dtype=np.float32) - region) * alpha
+            self.buf[y0:y1, x0:x1] = region.astype(np.uint8)
+            self._touch(y0, y1, x0, x1)
+
+    def blit(self, sprite, x, y, color, clip=None):
+        cx0, cy0, cx1, cy1 = clip or (0, 0, self.width, self.height)
+        h, w = sprite.shape
+        x0, y0 = int(round(x)) + sprite.dx, int(round(y)) + sprite.dy
+        sx0, sy0 = max(cx0 - x0, 0), max(cy0 - y0, 0)
+        sx1, sy1 = min(cx1 - x0, w), min(cy1 - y0, h)
+        if sx1 <= sx0 or sy1 <= sy0:
+            return
+        region = self.buf[y0 + sy0:y0 + sy1, x0 + sx0:x0 + sx1]
+        self._touch(y0 + sy0, y0 + sy1, x0 + sx0, x0 + sx1)
+
+        # (행, 가로 * RGB)로 펴서 블렌딩 표에서 한 번에 읽음
+        rows = region.reshape(sy1 - sy0, -1)
+        index = np.multiply(rows, 3, dtype=np.int32)
+        index += sprite.index[sy0:sy1, 3 * sx0:3 * sx1]
+        np.take(_blend_lut(tuple(np.asarray(color).tolist())), index, out=rows)
+
+
+class RasterRenderer:
+    """
+    프레임 단위 values/ranks(frame_plan.prepare_frames 결과)를 받아
+    RGB 프레임을 만들어내는 렌더러.
+    """
+
+    def __init__(self, df_values, df_ranks, period_labels, title, n_bars, style_cfg,
+                 value_fmt="{:,.0f}", bar_alpha=0.94):
+        rc = style_cfg["rc"]
+        self.n_bars = n_bars
+        self.bar_size = style_cfg.get("bar_size", 0.78)
+        self.value_fmt = value_fmt
+        self.values = df_values.to_numpy(dtype=float)
+        self.ranks = df_ranks.to_numpy(dtype=float)
+        self.period_labels = list(period_labels)
+
+        self.width, self.height = FIG_SIZE[0] * DPI, FIG_SIZE[1] * DPI
+        self.canvas = _Canvas(self.width, self.height)
+
+        # ── 축 영역 (figure 좌표 → 픽셀) ──
+        left, right, top, bottom = _subplot_rect(style_cfg)
+        self.ax_x0 = left * self.width
+        self.ax_x1 = right * self.width
+        self.ax_y0 = (1 - top) * self.height
+        self.ax_y1 = (1 - bottom) * self.height
+        self.clip = (
+            int(round(self.ax_x0)), int(round(self.ax_y0)),
+            int(round(self.ax_x1)), int(round(self.ax_y1)),
+        )
+
+        # bcr의 fixed_max / ylim 규칙을 그대로 따름
+        self.x_max = float(np.nanmax(self.values)) * 1.05 * 1.11 if self.values.size else 1.0
+        self.x_max = self.x_max or 1.0
+        self.y_min, self.y_max = 0.2, n_bars + 0.8
+
+        # ── 색상 ──
+        fig_bg = rc.get("figure.facecolor", "white")
+        self.fig_bg = fig_bg  # 비율이 다른 출력의 여백 색
+        ax_bg = rc.get("axes.facecolor", fig_bg)
+        self.text_color = _rgb(rc.get("text.color", "black"))
+        self.tick_color = _rgb(rc.get("ytick.color", rc.get("text.color", "black")))
+        self.bar_colors = [
+            _blend(c, ax_bg, bar_alpha)
+            for c in _bar_colors(style_cfg.get("cmap", "Pastel1"), self.values.shape[1])
+        ]
+
+        # ── sprite atlas ──
+        tick_font = _font("normal", _pt_to_px(style_cfg.get("tick_label_size", 18)))
+        bar_font = _font("normal", _pt_to_px(style_cfg.get("bar_label_size", 18)))
+        period_font = _font("bold", _pt_to_px(style_cfg.get("period_label_size", 28)))
+        title_font = _font("bold", _pt_to_px(style_cfg.get("title_size", 34)))
+
+        self.tick_pad = _pt_to_px(rc.get("ytick.major.pad", 3.5))
+        self.entity_sprites = [
+            _render_sprite(tick_font, str(name), "rm") for name in df_values.columns
+        ]
+        self.digits = _GlyphStrip(bar_font, "0123456789,.-")
+        self.period_sprites = {
+            s: _render_sprite(period_font, s, "rm") for s in set(self.period_labels)
+        }
+        self.period_pos = (
+            self.ax_x0 + 0.95 * (self.ax_x1 - self.ax_x0),
+            self.ax_y1 - style_cfg.get("period_label_y", 0.13) * (self.ax_y1 - self.ax_y0),
+        )
+
+        # ── 배경 (제목/그리드/축선) 한 번만 그려둠 ──
+        self.background = self._draw_background(
+            fig_bg, ax_bg, rc, title, title_font,
+            _rgb(style_cfg.get("title_color", "#3B3A36")),
+        )
+
+    def _x_to_px(self, x):
+        return self.ax_x0 + x / self.x_max * (self.ax_x1 - self.ax_x0)
+
+    def _y_to_px(self, y):
+        return self.ax_y0 + (self.y_max - y) / (self.y_max - self.y_min) * (self.ax_y1 - self.ax_y0)
+
+    def _draw_background(self, fig_bg, ax_bg, rc, title, title_font, title_color):
+        c = self.canvas
+        c.buf[:] = _rgb(fig_bg)
+        c.fill_rect(*self.clip, _rgb(ax_bg))
+
+        # x축 그리드 (chart.py에서 ax.xaxis.grid(True)로 항상 켬)
+        grid_color = _rgb(rc.get("grid.color", "#b0b0b0"))
+        grid_alpha = rc.get("grid.alpha", 1.0)
+        grid_w = max(1, _pt_to_px(0.8) // 2)
+        for tick in ticker.AutoLocator().tick_values(0, self.x_max):
+            if 0 <= tick <= self.x_max:
+                x = self._x_to_px(tick)
+                c.blend_rect(x - grid_w / 2, self.ax_y0, x + grid_w / 2, self.ax_y1,
+                             grid_color, grid_alpha)
+
+        # 왼쪽 축선만 얇게
+        spine_w = max(1, _pt_to_px(0.7) // 2)
+        c.fill_rect(self.ax_x0 - spine_w / 2, self.ax_y0, self.ax_x0 + spine_w / 2, self.ax_y1,
+                    _rgb(rc.get("axes.edgecolor", "black")))
+
+        if title:
+            sprite = _render_sprite(title_font, title, "mm")
+            c.blit(sprite, self.width / 2, (1 - 0.92) * self.height, title_color)
+
+        c.dirty = None
+        return c.buf.copy()
+
+    def _draw_value(self, value, x, y):
+        sprite = self.digits.compose(self.value_fmt.format(value), x)
+        if sprite is not None:
+            self.canvas.blit(sprite, x, y, self.text_color)
+
+    def render(self, i) -> np.ndarray:
+        """i번째 프레임을 그려서 내부 RGB 버퍼를 반환 (다음 호출 때 덮어씀)."""
+        c = self.canvas
+        c.restore(self.background)
+
+        loc = self.ranks[i]
+        vals = self.values[i]
+        visible = np.nonzero((loc > 0) & (loc < self.n_bars + 1))[0]
+
+        half = self.bar_size / 2
+        label_dx = 0.01 * (self.ax_x1 - self.ax_x0)
+        for j in visible:
+            y_top = self._y_to_px(loc[j] + half)
+            y_bot = self._y_to_px(loc[j] - half)
+            y_mid = self._y_to_px(loc[j])
+            x_end = self._x_to_px(vals[j])
+
+            c.fill_rect(self.ax_x0, y_top, x_end, y_bot, self.bar_colors[j], clip=self.clip)
+            c.blit(self.entity_sprites[j], self.ax_x0 - self.tick_pad, y_mid, self.tick_color,
+                   clip=(0, self.clip[1], self.clip[0], self.clip[3]))
+            if self.clip[1] <= y_mid <= self.clip[3]:
+                self._draw_value(vals[j], x_end + label_dx, y_mid)
+
+        c.blit(self.period_sprites[self.period_labels[i]], *self.period_pos, self.text_color)
+        return c.buf
+
+    def __len__(self):
+        return len(self.values)
+
+
+def render_raster_video(renderer: RasterRenderer, targets, fps, frame_indices=None,
+                        repeats=None, vfr=True, end_pause=0.0):
+    """
+    프레임을 그려서 FrameFanout(여러 출력 인코더)으로 보냄.
+    frame_indices/repeats를 주면 그 프레임만 그리고 repeats만큼 길게 유지 (정지 구간).
+    """
+    if frame_indices is None:
+        frame_indices = range(len(renderer))
+        repeats = [1] * len(renderer)
+
+    with FrameFanout(targets, (renderer.width, renderer.height), fps, pix_fmt="rgb24",
+                     repeats=repeats, vfr=vfr, end_pause=end_pause,
+                     pad_color=renderer.fig_bg) as fanout:
+        for i in frame_indices:
+            # 버퍼는 다음 프레임에서 재사용되므로 인코더 스레드용으로 bytes 복사
+            fanout.write(renderer.render(i).tobytes())
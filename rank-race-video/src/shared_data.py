@@ -0,0 +1,136 @@
+# src/shared_data.py
+"""
+전처리된 pivot을 여러 프로세스가 복사 없이 같이 쓰도록 공유하는 모듈.
+
+pivot(values 행렬 + 시간 index + entity 라벨)을 메모리 매핑 .npy 파일로 한 번 써두고,
+워커는 작은 handle만 pickle로 받아서 읽기 전용 NumPy view로 붙음.
+(/dev/shm이 있으면 그 아래에 만들어서 실제로는 공유 메모리에 올라감)
+
+사용 예:
+    with SharedPivot(pivot, period_fmt) as handle:
+        results = map_with_shared_pivot(render_variant, jobs, handle)
+
+    # 워커 쪽
+    def render_variant(pivot, period_fmt, job):
+        ...
+"""
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+_VALUES_FILE = "values.npy"
+_INDEX_FILE = "index.npy"
+_COLUMNS_FILE = "columns.npy"
+
+
+@dataclass(frozen=True)
+class SharedPivotHandle:
+    """워커에 넘기는 handle. 경로와 메타 정보만 들고 있어서 pickle 비용이 거의 없음."""
+    path: str
+    period_fmt: Optional[str] = None
+    index_name: Optional[str] = None
+    columns_name: Optional[str] = None
+
+
+def _default_base_dir():
+    # 리눅스면 tmpfs(/dev/shm)에 두고, 없으면 일반 임시 폴더
+    return "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+def _index_to_array(index: pd.Index) -> np.ndarray:
+    """index를 np.save 가능한 고정폭 배열로 변환 (datetime/숫자는 그대로, 나머지는 문자열)."""
+    arr = index.to_numpy()
+    if arr.dtype == object:
+        arr = arr.astype(str)
+    return arr
+
+
+class SharedPivot:
+    """
+    pivot을 공유 영역에 올리고 handle을 돌려주는 context manager.
+    with 블록을 빠져나가면 파일을 지워서 정리.
+    """
+
+    def __init__(self, pivot: pd.DataFrame, period_fmt=None, base_dir=None):
+        self.pivot = pivot
+        self.period_fmt = period_fmt
+        self.base_dir = base_dir or _default_base_dir()
+        self.handle = None
+
+    def __enter__(self) -> SharedPivotHandle:
+        path = tempfile.mkdtemp(prefix="rank_race_", dir=self.base_dir)
+        try:
+            values = np.ascontiguousarray(self.pivot.to_numpy())
+            np.save(os.path.join(path, _VALUES_FILE), values)
+            np.save(os.path.join(path, _INDEX_FILE), _index_to_array(self.pivot.index))
+            np.save(os.path.join(path, _COLUMNS_FILE), _index_to_array(self.pivot.columns))
+        except Exception:
+            shutil.rmtree(path, ignore_errors=True)
+            raise
+
+        self.handle = SharedPivotHandle(
+            path=path,
+            period_fmt=self.period_fmt,
+            index_name=self.pivot.index.name,
+            columns_name=self.pivot.columns.name,
+        )
+        return self.handle
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.handle is not None:
+            shutil.rmtree(self.handle.path, ignore_errors=True)
+            self.handle = None
+
+
+def attach_pivot(handle: SharedPivotHandle):
+    """
+    handle로 공유 pivot에 붙음.
+    values는 읽기 전용 memmap 위의 view라서 복사가 없음 (수정하려 하면 에러).
+
+    반환: (pivot, period_fmt)
+    """
+    values = np.load(os.path.join(handle.path, _VALUES_FILE), mmap_mode="r")
+    index = np.load(os.path.join(handle.path, _INDEX_FILE), mmap_mode="r")
+    columns = np.load(os.path.join(handle.path, _COLUMNS_FILE), mmap_mode="r")
+
+    pivot = pd.DataFrame(
+        values,
+        index=pd.Index(index, name=handle.index_name),
+        columns=pd.Index(columns, name=handle.columns_name),
+        copy=False,
+    )
+    return pivot, handle.period_fmt
+
+
+# ── 배치/병렬 실행 도우미 ──
+
+_worker_state = {}
+
+
+def _init_worker(handle):
+    # 워커 프로세스당 한 번만 붙어서 이후 job들이 재사용
+    _worker_state["pivot"], _worker_state["period_fmt"] = attach_pivot(handle)
+
+
+def _run_job(func, job):
+    return func(_worker_state["pivot"], _worker_state["period_fmt"], job)
+
+
+def map_with_shared_pivot(func, jobs, handle: SharedPivotHandle, max_workers=None):
+    """
+    jobs 각각에 대해 func(pivot, period_fmt, job)를 프로세스 풀에서 실행.
+    pivot은 handle로만 전달되므로 워커 수만큼 DataFrame을 pickle하지 않음.
+    func는 모듈 최상위 함수여야 함 (pickle 가능).
+    """
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker, initargs=(handle,)
+    ) as pool:
+        futures = [pool.submit(_run_job, func, job) for job in jobs]
+        return [f.result() for f in futures]
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 def filter_top_n_per_time(pivot: pd.DataFrame, n: int) -> pd.DataFrame:
@@ -17,31 +18,32 @@ def filter_top_n_per_time(pivot: pd.DataFrame, n: int) -> pd.DataFrame:
     -------
     pd.DataFrame
         모든 시점에서 Top N만 존재하는 pivot
+        (dtype은 입력 그대로, 원본 pivot은 수정하지 않음)
     """
 
-    filtered_frames = []
+    values = pivot.to_numpy()
+    n_rows, n_cols = values.shape
+    if n_rows == 0 or n_cols == 0:
+        return pivot.copy()
 
-    for timestamp, row in pivot.iterrows():
-        # 값이 큰 순으로 N개 entity 추출
-        top_entities = row.sort_values(ascending=False).head(n).index
+    # 시점별 Top N 위치 (값이 큰 순, 동점은 column 순서대로)
+    k = min(n, n_cols)
+    order = np.argsort(-values, axis=1, kind="stable")[:, :k]
+    in_top = np.zeros(values.shape, dtype=bool)
+    np.put_along_axis(in_top, order, True, axis=1)
 
-        # 전체 column 중 top_entities만 남김
-        filtered_row = row[top_entities].to_frame().T
-
-        # index 복구
-        filtered_row.index = [timestamp]
-
-        filtered_frames.append(filtered_row)
+    # 전체 시점에서 한 번이라도 TopN에 든 종목들만 column으로 사용
+    # (시간마다 종목 구성이 조금씩 달라도 OK)
+    keep = in_top.any(axis=0)
 
-    # 다시 하나로 합침
-    filtered_pivot = pd.concat(filtered_frames)
+    # 남길 column만 골라낸 배열(새 배열)에서 TopN 밖 값을 0으로 — 추가 복사 없음
+    filtered = values[:, keep]
+    filtered[~in_top[:, keep]] = 0
 
-    # 전체 시점에서 등장한 TopN 종목들만 column으로 사용
-    # (시간마다 종목 구성이 조금씩 달라도 OK)
-    filtered_pivot = filtered_pivot.reindex(
-        columns=sorted({col for df in filtered_frames for col in df.columns})
+    return pd.DataFrame(
+        filtered,
+        index=pivot.index,
+        columns=pivot.columns[keep],
+        copy=False,
     )
-
-    # NaN → 0
-    return filtered_pivot.fillna(0)
-# End of top_n_filter.py   
\ No newline at end of file
+# End of top_n_filter.py
@@ -0,0 +1,7 @@
+# tests/conftest.py
+# src/ 모듈은 'from cli import parse_args'처럼 평평하게 import하므로 경로만 추가
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
@@ -0,0 +1,44 @@
+# tests/fake_krx.py
+"""
+pykrx 없이 수집기를 검증하기 위한 메모리 안의 가짜 백엔드.
+
+PykrxBackend와 같은 메서드(market_cap_by_ticker / market_cap_by_date / ticker_name)를
+pykrx 응답과 같은 모양(index=티커 / index=날짜, 한글 컬럼)으로 돌려줌.
+영업일이 아닌 날짜는 pykrx처럼 빈 표.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def make_market_caps(start="2009-11-01", end="2014-12-31", n_tickers=60, seed=0):
+    """영업일 × 티커 시가총액 표 (종목마다 천천히 움직이는 랜덤 워크)."""
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range(start, end)
+    tickers = [f"{i:06d}" for i in range(n_tickers)]
+    base = np.exp(rng.normal(10, 1.5, n_tickers))
+    drift = rng.normal(0, 0.01, (len(days), n_tickers)).cumsum(axis=0)
+    return pd.DataFrame((base * np.exp(drift)).round(), index=days, columns=tickers)
+
+
+class FakeKrxBackend:
+    def __init__(self, caps: pd.DataFrame):
+        self.caps = caps
+
+    def market_cap_by_ticker(self, date_str, market):
+        day = pd.Timestamp(date_str)
+        if day not in self.caps.index:
+            return pd.DataFrame(columns=["종목명", "시가총액"]).rename_axis("티커")
+
+        row = self.caps.loc[day]
+        return pd.DataFrame(
+            {"종목명": [self.ticker_name(t) for t in row.index], "시가총액": row.to_numpy()},
+            index=pd.Index(row.index, name="티커"),
+        )
+
+    def market_cap_by_date(self, from_str, to_str, ticker):
+        s = self.caps.loc[pd.Timestamp(from_str):pd.Timestamp(to_str), ticker]
+        return pd.DataFrame({"시가총액": s.to_numpy()}, index=pd.Index(s.index, name="날짜"))
+
+    def ticker_name(self, ticker):
+        return f"종목{ticker}"
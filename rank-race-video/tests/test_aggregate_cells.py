@@ -0,0 +1,23 @@
+# tests/test_aggregate_cells.py
+"""aggregate_cells: 날/달 단위로 묶을 때 agg가 칸 안의 모든 행에 적용되는지."""
+
+import pandas as pd
+import pytest
+
+from data_processing import aggregate_cells
+
+# 같은 날 장중 세 행 (파일 순서와 시각 순서가 다름)
+TIMES = pd.to_datetime(["2024-01-02 09:00", "2024-01-02 15:00", "2024-01-02 12:00"])
+VALUES = [10.0, 20.0, 40.0]
+
+
+@pytest.mark.parametrize("time_unit", ["day", "month"])
+@pytest.mark.parametrize("agg, expected", [
+    ("last", 20.0), ("sum", 70.0), ("max", 40.0), ("mean", 70.0 / 3),
+])
+def test_bucketed_agg_uses_every_row(time_unit, agg, expected):
+    _, _, cells, values = aggregate_cells(
+        TIMES, pd.Index(["A"] * 3), VALUES, agg=agg, time_unit=time_unit
+    )
+    assert len(cells) == 1
+    assert values[0] == pytest.approx(expected)
@@ -0,0 +1,79 @@
+# tests/test_collect_strategies.py
+"""수집 방식(snapshot / ticker / auto)을 가짜 백엔드로 비교 (pykrx 설치 불필요)."""
+
+import sys
+from datetime import timedelta
+
+import pytest
+
+import market_snapshot_store
+from collect_korea_market_cap_monthly import (
+    CountingBackend,
+    OfflineCacheMiss,
+    collect_monthly,
+)
+from fake_krx import FakeKrxBackend, make_market_caps
+from market_snapshot_store import SnapshotStore
+
+COLS = ["ticker", "name", "market_cap", "date", "market"]
+
+
+@pytest.fixture(scope="module")
+def caps():
+    caps = make_market_caps()
+    # 2012-03 ~ 2012-09에만 1위였다가 사라지는 종목 (구간 중간 진입)
+    caps["999999"] = 1.0
+    caps.loc["2012-03-01":"2012-09-30", "999999"] = caps.to_numpy().max() * 10
+    return caps
+
+
+def _collect(caps, strategy, start="2010-01-01", end="2014-12-31", top_n=10, **kwargs):
+    backend = CountingBackend(FakeKrxBackend(caps))
+    df = collect_monthly(start, end, "KOSPI", top_n=top_n, strategy=strategy,
+                         backend=backend, **kwargs)
+    return df.reset_index(drop=True)[COLS], backend
+
+
+def test_pykrx_not_required():
+    assert "pykrx" not in sys.modules
+
+
+@pytest.mark.parametrize("strategy", ["ticker", "auto"])
+def test_strategies_match_snapshot(caps, strategy):
+    expected, snap_backend = _collect(caps, "snapshot")
+    result, backend = _collect(caps, strategy)
+
+    assert (expected["ticker"] == "999999").sum() == 7
+    assert result.equals(expected)
+    assert sum(backend.calls.values()) < sum(snap_backend.calls.values())
+
+
+def test_offline_rerun_with_other_window_uses_store(caps, tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    _collect(caps, "ticker", store=store)
+
+    expected, _ = _collect(caps, "snapshot", start="2011-05-01", end="2013-06-30")
+    result, backend = _collect(
+        caps, "ticker", start="2011-05-01", end="2013-06-30",
+        store=SnapshotStore(str(tmp_path)), offline=True,
+    )
+
+    assert sum(backend.calls.values()) == 0
+    assert result.equals(expected)
+
+
+def test_offline_miss_fails_loudly(caps, tmp_path):
+    with pytest.raises(OfflineCacheMiss):
+        _collect(caps, "ticker", store=SnapshotStore(str(tmp_path)), offline=True)
+
+
+@pytest.mark.parametrize("strategy", ["snapshot", "ticker"])
+def test_old_blank_snapshots_do_not_expire(caps, tmp_path, monkeypatch, strategy):
+    # 한참 지난 날짜의 빈 응답(휴일 월말)은 비거래일로 확정 → 한 달 뒤에도 다시 부르지 않음
+    _collect(caps, strategy, store=SnapshotStore(str(tmp_path)))
+
+    later = market_snapshot_store._now() + timedelta(days=31)
+    monkeypatch.setattr(market_snapshot_store, "_now", lambda: later)
+    _, backend = _collect(caps, strategy, top_n=5, store=SnapshotStore(str(tmp_path)))
+
+    assert sum(backend.calls.values()) == 0
@@ -0,0 +1,49 @@
+# tests/test_db_source.py
+"""SQLite 입력: 기간 필터를 SQL로 내려보내도 CSV 경로와 같은 결과인지."""
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from data_processing import prepare_dataframe
+from db_source import read_database
+
+START, END = "2014-01-01", "2014-06-30"
+
+
+def _frame(time_text):
+    days = pd.bdate_range("2013-10-01", "2014-09-30")
+    rows = [(time_text(d, e), f"E{e}", float((i * 7 + e * 13) % 97))
+            for i, d in enumerate(days) for e in range(4)]
+    return pd.DataFrame(rows, columns=["date", "name", "v"])
+
+
+def _write_db(df, path):
+    con = sqlite3.connect(path)
+    df.to_sql("t", con, index=False)
+    con.close()
+
+
+def _prepare(df, **kwargs):
+    pivot, _ = prepare_dataframe(df, "date", "name", "v", start_time=START, end_time=END,
+                                 value_scale=1, **kwargs)
+    return pivot
+
+
+@pytest.mark.parametrize("time_text, pushed", [
+    (lambda d, e: d.strftime("%Y-%m-%d"), True),
+    (lambda d, e: d.strftime("%Y-%m-%d") + (" 09:00:00" if e % 2 else " 15:30:00"), True),
+    # 형식이 섞이면 pandas가 시간 파싱을 포기하므로 내려보내지 않음
+    (lambda d, e: d.strftime("%Y-%m-%d") + ("" if e % 2 else " 15:30:00"), False),
+])
+@pytest.mark.parametrize("time_unit", ["raw", "day"])
+def test_iso_text_bounds_match_csv_path(tmp_path, time_text, pushed, time_unit):
+    df = _frame(time_text)
+    _write_db(df, tmp_path / "t.db")
+
+    read = read_database(tmp_path / "t.db", "date", "name", "v", table="t",
+                         start_time=START, end_time=END)
+
+    assert (len(read) < len(df)) == pushed
+    assert _prepare(read, time_unit=time_unit).equals(_prepare(df, time_unit=time_unit))
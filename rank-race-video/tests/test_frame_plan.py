@@ -0,0 +1,30 @@
+# tests/test_frame_plan.py
+"""adaptive 보간: 추월 구간은 고정 방식보다 프레임이 적어지지 않는지."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from frame_plan import compute_change_scores, plan_adaptive_steps
+
+
+@pytest.fixture(scope="module")
+def pivot():
+    rng = np.random.default_rng(1)
+    values = np.exp(rng.normal(0, 0.05, (120, 12)).cumsum(axis=0)) * np.linspace(1, 2, 12)
+    values[40:70] = values[40]  # 순위도 값도 그대로인 조용한 구간
+    return pd.DataFrame(values, index=pd.date_range("2000-01-31", periods=120, freq="M"))
+
+
+@pytest.mark.parametrize("budget", [None, 1200])
+def test_overtakes_keep_fixed_steps(pivot, budget):
+    _, rank_moves = compute_change_scores(pivot, 5)
+    steps = plan_adaptive_steps(pivot, 5, 8, budget=budget)
+
+    assert (rank_moves > 0).any() and (rank_moves == 0).any()
+    assert steps[rank_moves > 0].min() >= 8
+    assert steps[rank_moves == 0].min() == 1
+    if budget is None:
+        assert steps.sum() < 8 * len(steps)
+    else:
+        assert steps.sum() == budget
@@ -0,0 +1,41 @@
+# tests/test_raster_engine.py
+"""숫자 라벨을 한 번에 합성해서 블렌딩해도 글자마다 블렌딩한 것과 같은 픽셀이 나오는지."""
+
+import numpy as np
+import pytest
+
+from raster_engine import _Canvas, _GlyphStrip, _font, _render_sprite
+
+CHARS = "0123456789,.-"
+COLOR = np.array([230, 220, 40], dtype=np.uint8)
+
+
+def _blit_per_glyph(canvas, font, text, x, y):
+    """예전 방식: 글자마다 알파 마스크를 float로 블렌딩."""
+    for ch in text:
+        sprite = _render_sprite(font, ch, "lm")
+        h, w = sprite.shape
+        x0, y0 = int(round(x)) + sprite.dx, int(round(y)) + sprite.dy
+        a = (sprite.index[:, ::3] // 768)[:, :, None].astype(np.float64)
+        region = canvas.buf[y0:y0 + h, x0:x0 + w].astype(np.float64)
+        canvas.buf[y0:y0 + h, x0:x0 + w] = np.rint(
+            (region * (255 - a) + COLOR * a) / 255
+        ).astype(np.uint8)
+        x += font.getlength(ch)
+
+
+@pytest.mark.parametrize("text, x", [("1,234,567", 40.0), ("-9.5", 40.37), ("8,008", 40.5)])
+def test_composed_label_matches_per_glyph_blend(text, x):
+    font = _font("normal", 40)
+    rng = np.random.default_rng(0)
+    background = rng.integers(0, 256, (120, 400, 3), dtype=np.uint8)
+
+    expected = _Canvas(400, 120)
+    expected.buf[:] = background
+    _blit_per_glyph(expected, font, text, x, 60)
+
+    canvas = _Canvas(400, 120)
+    canvas.buf[:] = background
+    canvas.blit(_GlyphStrip(font, CHARS).compose(text, x), x, 60, COLOR)
+
+    assert np.array_equal(canvas.buf, expected.buf)